@@ -0,0 +1,66 @@
+import random
+from typing import List
+
+SHAPE_MODULE = """module shapes {
+    type Shape {
+        integer::sideCount;
+    }
+}
+"""
+
+
+def generate_source(functions: int, nesting_depth: int = 2, objects: bool = True, seed: int = 0) -> str:
+    """Synthetic Fortiori source with the given number of functions followed by a program calling them.
+    Each function mixes case-sensitive identifiers, string literals containing '!', '{' and quotes, nested
+    if/else and do blocks and, with objects, object declarations and cast() calls."""
+    generator = random.Random(seed)
+    parts = [SHAPE_MODULE]
+    for index in range(functions):
+        parts.append(_function(index, nesting_depth, objects, generator))
+    parts.append(_program(functions, generator))
+    return "\n".join(parts)
+
+
+def generate_source_of_size(lines: int, nesting_depth: int = 2, objects: bool = True, seed: int = 0) -> str:
+    """Synthetic source with approximately the given number of lines."""
+    lines_per_function = generate_source(2, nesting_depth, objects, seed).count("\n") \
+                         - generate_source(1, nesting_depth, objects, seed).count("\n")
+    return generate_source(max(1, lines // lines_per_function), nesting_depth, objects, seed)
+
+
+def _function(index: int, nesting_depth: int, objects: bool, generator: random.Random) -> str:
+    lines = [f"real function computeValue{index}(real::InputValue, integer::loopCount) {{",
+             "    use iso_c_binding",
+             f"    real::ResultValue = InputValue * {generator.randint(1, 9)}.0; ! scaled 'input'",
+             f"    print*, \"it's {index}! {{not a block}}\", 'say \"hi\"';"]
+    if objects:
+        lines += ["    Shape, object :: currentShape;",
+                  f"    currentShape = cast(shapePointer{index});"]
+    lines += _nested_blocks(nesting_depth, 1, generator)
+    lines += ["    return ResultValue;",
+              "}"]
+    return "\n".join(lines)
+
+
+def _nested_blocks(depth: int, indentation: int, generator: random.Random) -> List[str]:
+    if depth == 0:
+        return [f"{'    ' * indentation}ResultValue = ResultValue + {generator.randint(1, 9)}.0;"]
+    padding = "    " * indentation
+    counter = f"k{depth}"
+    return [f"{padding}do integer::{counter} = 1, loopCount {{",
+            f"{padding}    if (ResultValue > {generator.randint(10, 99)}.0) {{",
+            *_nested_blocks(depth - 1, indentation + 2, generator),
+            f"{padding}    }} else {{",
+            f"{padding}        print*, \"Small {{value}}! \", ResultValue;",
+            f"{padding}    }}",
+            f"{padding}}}"]
+
+
+def _program(functions: int, generator: random.Random) -> str:
+    calls = [f"    TotalValue = TotalValue + computeValue{generator.randrange(functions)}(1.5, {index + 2});"
+             for index in range(min(functions, 20))]
+    return "\n".join(["program {",
+                      "    real::TotalValue = 0.0;",
+                      *calls,
+                      "    print*, \"Total: \", TotalValue;",
+                      "}"])
@@ -0,0 +1,288 @@
+module shapes 
+ type s$hape 
+ integer::sidec$ount;
+ 
+end type;
+end module;
+real function computev$alue0(i$nputv$alue,loopc$ount) 
+ use iso_c_binding
+implicit none;
+real::i$nputv$alue;
+integer::loopc$ount;
+real::r$esultv$alue;
+type(s$hape),pointer::currents$hape;
+ integer::k2;
+ integer::k1;
+r$esultv$alue = i$nputv$alue * 3.0; 
+ print*, "it's 0! {not a block}", 'say "hi"';
+ select type(a => shapep$ointer0)
+ class is (s$hape)
+ currents$hape => a
+ end select;
+do k2 = 1, loopc$ount 
+ if (r$esultv$alue > 82.0) then
+do k1 = 1, loopc$ount 
+ if (r$esultv$alue > 18.0) then
+ r$esultv$alue = r$esultv$alue + 5.0;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ computev$alue0 = r$esultv$alue;
+return;
+end function;
+real function computev$alue1(i$nputv$alue,loopc$ount) 
+ use iso_c_binding
+implicit none;
+real::i$nputv$alue;
+integer::loopc$ount;
+real::r$esultv$alue;
+type(s$hape),pointer::currents$hape;
+ integer::k2;
+ integer::k1;
+r$esultv$alue = i$nputv$alue * 2.0; 
+ print*, "it's 1! {not a block}", 'say "hi"';
+ select type(a => shapep$ointer1)
+ class is (s$hape)
+ currents$hape => a
+ end select;
+do k2 = 1, loopc$ount 
+ if (r$esultv$alue > 73.0) then
+do k1 = 1, loopc$ount 
+ if (r$esultv$alue > 67.0) then
+ r$esultv$alue = r$esultv$alue + 8.0;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ computev$alue1 = r$esultv$alue;
+return;
+end function;
+real function computev$alue2(i$nputv$alue,loopc$ount) 
+ use iso_c_binding
+implicit none;
+real::i$nputv$alue;
+integer::loopc$ount;
+real::r$esultv$alue;
+type(s$hape),pointer::currents$hape;
+ integer::k2;
+ integer::k1;
+r$esultv$alue = i$nputv$alue * 7.0; 
+ print*, "it's 2! {not a block}", 'say "hi"';
+ select type(a => shapep$ointer2)
+ class is (s$hape)
+ currents$hape => a
+ end select;
+do k2 = 1, loopc$ount 
+ if (r$esultv$alue > 36.0) then
+do k1 = 1, loopc$ount 
+ if (r$esultv$alue > 22.0) then
+ r$esultv$alue = r$esultv$alue + 8.0;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ computev$alue2 = r$esultv$alue;
+return;
+end function;
+real function computev$alue3(i$nputv$alue,loopc$ount) 
+ use iso_c_binding
+implicit none;
+real::i$nputv$alue;
+integer::loopc$ount;
+real::r$esultv$alue;
+type(s$hape),pointer::currents$hape;
+ integer::k2;
+ integer::k1;
+r$esultv$alue = i$nputv$alue * 1.0; 
+ print*, "it's 3! {not a block}", 'say "hi"';
+ select type(a => shapep$ointer3)
+ class is (s$hape)
+ currents$hape => a
+ end select;
+do k2 = 1, loopc$ount 
+ if (r$esultv$alue > 59.0) then
+do k1 = 1, loopc$ount 
+ if (r$esultv$alue > 65.0) then
+ r$esultv$alue = r$esultv$alue + 1.0;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ computev$alue3 = r$esultv$alue;
+return;
+end function;
+real function computev$alue4(i$nputv$alue,loopc$ount) 
+ use iso_c_binding
+implicit none;
+real::i$nputv$alue;
+integer::loopc$ount;
+real::r$esultv$alue;
+type(s$hape),pointer::currents$hape;
+ integer::k2;
+ integer::k1;
+r$esultv$alue = i$nputv$alue * 8.0; 
+ print*, "it's 4! {not a block}", 'say "hi"';
+ select type(a => shapep$ointer4)
+ class is (s$hape)
+ currents$hape => a
+ end select;
+do k2 = 1, loopc$ount 
+ if (r$esultv$alue > 44.0) then
+do k1 = 1, loopc$ount 
+ if (r$esultv$alue > 39.0) then
+ r$esultv$alue = r$esultv$alue + 2.0;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ computev$alue4 = r$esultv$alue;
+return;
+end function;
+real function computev$alue5(i$nputv$alue,loopc$ount) 
+ use iso_c_binding
+implicit none;
+real::i$nputv$alue;
+integer::loopc$ount;
+real::r$esultv$alue;
+type(s$hape),pointer::currents$hape;
+ integer::k2;
+ integer::k1;
+r$esultv$alue = i$nputv$alue * 6.0; 
+ print*, "it's 5! {not a block}", 'say "hi"';
+ select type(a => shapep$ointer5)
+ class is (s$hape)
+ currents$hape => a
+ end select;
+do k2 = 1, loopc$ount 
+ if (r$esultv$alue > 13.0) then
+do k1 = 1, loopc$ount 
+ if (r$esultv$alue > 12.0) then
+ r$esultv$alue = r$esultv$alue + 1.0;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ computev$alue5 = r$esultv$alue;
+return;
+end function;
+real function computev$alue6(i$nputv$alue,loopc$ount) 
+ use iso_c_binding
+implicit none;
+real::i$nputv$alue;
+integer::loopc$ount;
+real::r$esultv$alue;
+type(s$hape),pointer::currents$hape;
+ integer::k2;
+ integer::k1;
+r$esultv$alue = i$nputv$alue * 9.0; 
+ print*, "it's 6! {not a block}", 'say "hi"';
+ select type(a => shapep$ointer6)
+ class is (s$hape)
+ currents$hape => a
+ end select;
+do k2 = 1, loopc$ount 
+ if (r$esultv$alue > 11.0) then
+do k1 = 1, loopc$ount 
+ if (r$esultv$alue > 58.0) then
+ r$esultv$alue = r$esultv$alue + 4.0;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ computev$alue6 = r$esultv$alue;
+return;
+end function;
+real function computev$alue7(i$nputv$alue,loopc$ount) 
+ use iso_c_binding
+implicit none;
+real::i$nputv$alue;
+integer::loopc$ount;
+real::r$esultv$alue;
+type(s$hape),pointer::currents$hape;
+ integer::k2;
+ integer::k1;
+r$esultv$alue = i$nputv$alue * 7.0; 
+ print*, "it's 7! {not a block}", 'say "hi"';
+ select type(a => shapep$ointer7)
+ class is (s$hape)
+ currents$hape => a
+ end select;
+do k2 = 1, loopc$ount 
+ if (r$esultv$alue > 13.0) then
+do k1 = 1, loopc$ount 
+ if (r$esultv$alue > 77.0) then
+ r$esultv$alue = r$esultv$alue + 4.0;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ else
+ print*, "Small {value}! ", r$esultv$alue;
+ end if;
+ 
+end do;
+ computev$alue7 = r$esultv$alue;
+return;
+end function;
+program main 
+implicit none;
+real::computev$alue7;
+real::computev$alue3;
+real::computev$alue5;
+real::computev$alue4;
+real::t$otalv$alue;
+t$otalv$alue = 0.0;
+ t$otalv$alue = t$otalv$alue + computev$alue7(1.5, 2);
+ t$otalv$alue = t$otalv$alue + computev$alue7(1.5, 3);
+ t$otalv$alue = t$otalv$alue + computev$alue3(1.5, 4);
+ t$otalv$alue = t$otalv$alue + computev$alue5(1.5, 5);
+ t$otalv$alue = t$otalv$alue + computev$alue3(1.5, 6);
+ t$otalv$alue = t$otalv$alue + computev$alue3(1.5, 7);
+ t$otalv$alue = t$otalv$alue + computev$alue7(1.5, 8);
+ t$otalv$alue = t$otalv$alue + computev$alue4(1.5, 9);
+ print*, "Total: ", t$otalv$alue;
+end program;
\ No newline at end of file
@@ -0,0 +1,133 @@
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Dict, List, Callable
+
+from benchmarks.corpus import generate_source_of_size
+from benchmarks.run_benchmarks import PASSES, PIPELINE, time_call, peak_memory
+from fortiori.build import build, output_path
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(HERE, "golden")
+BASELINE = os.path.join(HERE, "baseline.json")
+
+# Sources transpiled by the golden check, each expected to produce the .f90 file of the same name in GOLDEN_DIR.
+GOLDEN_SOURCES = [os.path.join(HERE, os.pardir, "example.ff"), os.path.join(GOLDEN_DIR, "generated.ff")]
+
+
+def check_outputs(source_paths: List[str] = GOLDEN_SOURCES, golden_dir: str = GOLDEN_DIR,
+                  update: bool = False) -> List[str]:
+    """Builds every source as the command line does and compares it with its golden output. Returns one message
+    per mismatch. update : Overwrites the golden outputs instead."""
+    failures = []
+    with tempfile.TemporaryDirectory() as output_dir, open(os.devnull, 'w') as devnull, \
+            redirect_stdout(devnull), redirect_stderr(devnull):
+        for result in build(source_paths, output_dir):
+            golden = output_path(result.source_path, golden_dir)
+            if update and result.is_success():
+                with open(golden, 'w') as f:
+                    f.write(result.text)
+            elif not result.is_success():
+                failures.append(f"{result.source_path}: {result.error}")
+            elif not os.path.exists(golden) or _read(golden) != result.text:
+                failures.append(f"{result.source_path}: output differs from {golden}")
+    return failures
+
+
+def calibrate() -> float:
+    """Best time of a fixed workload, in seconds. Baselines are scaled by the ratio of calibrations, so that a
+    baseline recorded on one machine can be checked on another."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        words = [f"word{i % 97}" for i in range(100000)]
+        " ".join(words).split(" ")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(lines: int, repeat: int) -> Dict:
+    """Best time and peak memory of each pass, chained as in the benchmarks, and of a command line build."""
+    text = generate_source_of_size(lines)
+    passes: Dict[str, Dict[str, float]] = {}
+    stage_input = text
+    for name, function, feeds_next_pass in PASSES:
+        seconds, output = time_call(function, stage_input, repeat)
+        passes[name] = {"seconds": seconds, "peak_memory": peak_memory(function, stage_input)}
+        if feeds_next_pass:
+            stage_input = output
+
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, 'w') as devnull, redirect_stderr(devnull):
+        source_path = os.path.join(directory, "source.ff")
+        with open(source_path, 'w') as f:
+            f.write(text)
+        build_file = _build_file(source_path, os.path.join(directory, "out"))
+        seconds, _ = time_call(build_file, text, repeat)
+        passes[PIPELINE] = {"seconds": seconds, "peak_memory": peak_memory(build_file, text)}
+
+    return {"python_version": platform.python_version(), "lines": lines, "repeat": repeat,
+            "calibration": calibrate(), "passes": passes}
+
+
+def compare(baseline: Dict, current: Dict, time_threshold: float, memory_threshold: float,
+            time_slack: float = 0.005) -> List[str]:
+    """One message per pass whose time or peak memory grew past its threshold, a ratio to the baseline.
+    time_slack : Seconds ignored on top of the threshold, so that very short passes do not fail on noise."""
+    scale = current["calibration"] / baseline["calibration"]
+    regressions = []
+    for name, recorded in baseline["passes"].items():
+        measured = current["passes"].get(name)
+        if measured is None:
+            continue
+        allowed_seconds = recorded["seconds"] * scale * time_threshold + time_slack
+        if measured["seconds"] > allowed_seconds:
+            regressions.append(f"{name}: {measured['seconds']:.4f}s, baseline {recorded['seconds'] * scale:.4f}s "
+                               f"(threshold x{time_threshold})")
+        if measured["peak_memory"] > recorded["peak_memory"] * memory_threshold:
+            regressions.append(f"{name}: peak {measured['peak_memory'] / 1e6:.1f} MB, baseline "
+                               f"{recorded['peak_memory'] / 1e6:.1f} MB (threshold x{memory_threshold})")
+    return regressions
+
+
+def _build_file(source_path: str, output_dir: str) -> Callable[[str], None]:
+    return lambda _: build([source_path], output_dir)
+
+
+def _read(path: str) -> str:
+    with open(path, 'r') as f:
+        return f.read()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Fails when the golden outputs change, or when a pass becomes slower or "
+                                        "uses more memory than its stored baseline.")
+    parser.add_argument("--time-threshold", dest="time_threshold", type=float,
+                        default=float(os.environ.get("FORTIORI_TIME_THRESHOLD", 3.0)),
+                        help="allowed ratio of a pass's time to its baseline")
+    parser.add_argument("--memory-threshold", dest="memory_threshold", type=float,
+                        default=float(os.environ.get("FORTIORI_MEMORY_THRESHOLD", 1.5)),
+                        help="allowed ratio of a pass's peak memory to its baseline")
+    parser.add_argument("--lines", type=int, default=1000, help="size of the timed source, in lines")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repetitions, the best one is kept")
+    parser.add_argument("--update", action="store_true", help="record new golden outputs and baselines")
+    args = parser.parse_args()
+
+    failures = check_outputs(update=args.update)
+    current = measure(args.lines, args.repeat)
+    if args.update:
+        with open(BASELINE, 'w') as f:
+            json.dump(current, f, indent=2)
+    else:
+        with open(BASELINE, 'r') as f:
+            failures += compare(json.load(f), current, args.time_threshold, args.memory_threshold)
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print("No output or performance regression.")
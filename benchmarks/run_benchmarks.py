@@ -0,0 +1,127 @@
+import json
+import math
+import os
+import platform
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Callable, List, Dict, Tuple
+
+from benchmarks.corpus import generate_source_of_size
+from fortiori import __version__
+from fortiori.syntax import parse
+from fortiori.simple_operations import strip_comments, move_function_parameter_type_declaration_to_body, \
+    move_variable_declaration_to_start_of_block, declare_invoked_function_return_types, translate_return_statement, \
+    remove_line_splits_inside_blocks, add_implicit_none, add_name_to_unnamed_program_blocks, \
+    convert_conditional_blocks, inline_pointer_cast_function, replace_object_reference_type_declaration, \
+    translate_case_sensitive_identifier, remove_curly_brackets
+from fortiori.transpiler import Transpiler
+
+# (name, pass, whether its output feeds the next pass), in the order the transpiler runs them.
+PASSES: List[Tuple[str, Callable[[str], str], bool]] = [
+    ("strip_comments", strip_comments, True),
+    ("move_function_parameter_type_declaration_to_body", move_function_parameter_type_declaration_to_body, True),
+    ("move_variable_declaration_to_start_of_block", move_variable_declaration_to_start_of_block, True),
+    ("declare_invoked_function_return_types", declare_invoked_function_return_types, False),
+    ("translate_return_statement", translate_return_statement, True),
+    ("remove_line_splits_inside_blocks", remove_line_splits_inside_blocks, True),
+    ("add_implicit_none", add_implicit_none, True),
+    ("add_name_to_unnamed_program_blocks", add_name_to_unnamed_program_blocks, True),
+    ("convert_conditional_blocks", convert_conditional_blocks, True),
+    ("inline_pointer_cast_function", inline_pointer_cast_function, True),
+    ("replace_object_reference_type_declaration", replace_object_reference_type_declaration, True),
+    ("translate_case_sensitive_identifier", translate_case_sensitive_identifier, True),
+    ("remove_curly_brackets", remove_curly_brackets, True),
+]
+PIPELINE = "pipeline"
+
+
+def time_call(function: Callable[[str], str], text: str, repeat: int) -> Tuple[float, str]:
+    """Best wall time in seconds over the repetitions, and the output. Warnings printed by passes are discarded."""
+    best, output = math.inf, text
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = function(text)
+            best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def peak_memory(function: Callable, text: str) -> int:
+    """Peak memory allocated by the call, in bytes, as traced by tracemalloc. Warnings printed by passes are
+    discarded."""
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+        tracemalloc.start()
+        try:
+            function(text)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def benchmark_size(lines: int, repeat: int, nesting_depth: int, seed: int, memory: bool = False) -> Dict:
+    text = generate_source_of_size(lines, nesting_depth=nesting_depth, seed=seed)
+    timings: Dict[str, float] = {}
+
+    stage_input = text
+    for name, function, feeds_next_pass in PASSES:
+        timings[name], output = time_call(function, stage_input, repeat)
+        if feeds_next_pass:
+            stage_input = output
+
+    timings[PIPELINE], _ = time_call(Transpiler().transpile, text, repeat)
+    result = {"lines": text.count("\n") + 1, "bytes": len(text), "seconds": timings}
+    if memory:
+        result["peak_memory"] = {"parse": peak_memory(parse, text), PIPELINE: peak_memory(Transpiler().transpile, text)}
+    return result
+
+
+def growth_exponent(sizes: List[float], seconds: List[float]) -> float:
+    """Least-squares slope of log(time) against log(size). 1 is linear growth, 2 is quadratic."""
+    points = [(math.log(size), math.log(max(duration, 1e-9))) for size, duration in zip(sizes, seconds)]
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance if variance else 0.0
+
+
+def run(sizes: List[int], repeat: int, nesting_depth: int, seed: int, memory: bool = False) -> Dict:
+    results = []
+    for lines in sizes:
+        result = benchmark_size(lines, repeat, nesting_depth, seed, memory)
+        print(f"{result['lines']:>8} lines  pipeline {result['seconds'][PIPELINE]:9.3f}s" +
+              (f"  peak {result['peak_memory'][PIPELINE] / 1e6:9.1f} MB"
+               f"  parse peak {result['peak_memory']['parse'] / 1e6:9.1f} MB" if memory else ""))
+        results.append(result)
+
+    names = [name for name, _, _ in PASSES] + [PIPELINE]
+    exponents = {name: growth_exponent([result["bytes"] for result in results],
+                                       [result["seconds"][name] for result in results])
+                 for name in names} if len(results) > 1 else {}
+    return {"fortiori_version": __version__,
+            "python_version": platform.python_version(),
+            "repeat": repeat,
+            "nesting_depth": nesting_depth,
+            "seed": seed,
+            "results": results,
+            "growth_exponents": exponents}
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Times each fortiori pass and the full pipeline on synthetic sources.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated source sizes, in lines")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repetitions, the best one is kept")
+    parser.add_argument("--nesting-depth", dest="nesting_depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true",
+                        help="also record the peak memory of parsing and of the pipeline, with tracemalloc")
+    parser.add_argument("--output", default="benchmarks/results.json", help="JSON results file")
+    args = parser.parse_args()
+
+    report = run([int(size) for size in args.sizes.split(",")], args.repeat, args.nesting_depth, args.seed, args.memory)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, exponent in report["growth_exponents"].items():
+        print(f"{name:<50} n^{exponent:.2f}")
@@ -0,0 +1,3 @@
+__version__ = "@@VERSION@@"
+
+from fortiori.api import transpile, transpile_many
@@ -1,35 +1,103 @@
+import os
+import sys
 from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import json
 
-from fortiori.simple_operations import move_function_parameter_type_declaration_to_body, \
-    remove_line_splits_inside_blocks, remove_curly_brackets, strip_comments, \
-    move_variable_declaration_to_start_of_block, translate_return_statement, declare_invoked_function_return_types, \
-    add_implicit_none, add_name_to_unnamed_program_blocks, translate_case_sensitive_identifier, \
-    convert_conditional_blocks, replace_object_reference_type_declaration, inline_pointer_cast_function
+from fortiori.async_build import build_async
+from fortiori.build import build, cache_statistics, BuildOptions, location, output_conflicts
+from fortiori.cache import BuildCache
+from fortiori.compat import nullcontext, run
+from fortiori.profiling import PipelineProfiler
+from fortiori.streaming import stream_file, STDIO
+from fortiori.transpiler import Transpiler
+from fortiori.watch import watch
+from fortiori.worker import serve
 
 parser = ArgumentParser(description="Fortiori FORTRAN transpiler")
 
 parser.add_argument("--output-dir", dest="output_dir", default="out")
-parser.add_argument("files", nargs="+", help="files")
+parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=1,
+                    help="number of worker processes, 0 for one per CPU")
+parser.add_argument("--cache-dir", dest="cache_dir", default=None,
+                    help="reuse previous outputs for unchanged files")
+parser.add_argument("--incremental", dest="incremental", action="store_true",
+                    help="only retranspile the program units which changed")
+parser.add_argument("--split-units", dest="split_units", action="store_true",
+                    help="with -j, transpile the program units of each file in parallel rather than the files")
+parser.add_argument("--watch", dest="watch", action="store_true",
+                    help="keep running and retranspile files when they change")
+parser.add_argument("--watch-interval", dest="watch_interval", type=float, default=0.5,
+                    help="seconds between polls in watch mode")
+parser.add_argument("--stream", dest="stream", action="store_true",
+                    help="transpile and write one program unit at a time; use '-' as file for stdin to stdout")
+parser.add_argument("--profile", dest="profile", action="store_true",
+                    help="print the time, size, edits and peak memory of every pass; disables the cache and -j")
+parser.add_argument("--profile-json", dest="profile_json", default=None,
+                    help="write the per-file, per-pass measurements to this file")
+parser.add_argument("--profile-pass", dest="profile_pass", default=None,
+                    help="run this pass under cProfile")
+parser.add_argument("--profile-dump", dest="profile_dump", default="fortiori.prof",
+                    help="cProfile output file for --profile-pass")
+parser.add_argument("--async-io", dest="async_io", action="store_true",
+                    help="overlap reads, transpiles and writes, then report the throughput")
+parser.add_argument("--io-concurrency", dest="io_concurrency", type=int, default=8,
+                    help="reads and writes in flight at once with --async-io")
+parser.add_argument("--queue-depth", dest="queue_depth", type=int, default=16,
+                    help="files waiting between two stages with --async-io")
+parser.add_argument("--worker", dest="worker", action="store_true",
+                    help="answer newline-delimited JSON requests on stdin until its end, see fortiori.worker")
+parser.add_argument("files", nargs="*", help="files, or directories of .ff files in watch mode")
 
 args = parser.parse_args()
+if not args.files and not args.worker:
+    parser.error("the following arguments are required: files")
 
-for file in args.files:
-    with open(file, 'r') as f:
-        text = f.read()
-
-        text = strip_comments(text)
-        text = move_function_parameter_type_declaration_to_body(text)
-        text = move_variable_declaration_to_start_of_block(text)
-        # text = declare_invoked_function_return_types(text)
-        text = translate_return_statement(text)
-        text = remove_line_splits_inside_blocks(text)
-        text = add_implicit_none(text)
-        text = translate_case_sensitive_identifier(text)
-        text = add_name_to_unnamed_program_blocks(text)
-        text = convert_conditional_blocks(text)
-        text = inline_pointer_cast_function(text)
-        text = replace_object_reference_type_declaration(text)
-        text = remove_curly_brackets(text)
-
-        with open(args.output_dir, 'w') as outfile:
-            outfile.write(text)
+cache = BuildCache(args.cache_dir) if args.cache_dir else None
+jobs = args.jobs or os.cpu_count()
+profiling = args.profile or args.profile_json or args.profile_pass
+profiler = PipelineProfiler(cprofile_pass=args.profile_pass) if profiling else None
+options = BuildOptions(cache, args.incremental, profiler, args.split_units)
+
+if args.worker:
+    serve(sys.stdin, sys.stdout, options)
+    sys.exit(0)
+
+if args.watch:
+    with ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext() as executor:
+        watch(args.files, args.output_dir, args.watch_interval, options, executor)
+    sys.exit(0)
+
+if args.stream:
+    conflicts = output_conflicts([path for path in args.files if path != STDIO], args.output_dir)
+    for source_path, error in conflicts.items():
+        print(f"{source_path}: {error}", file=sys.stderr)
+    succeeded = not conflicts
+    for source_path in [path for path in args.files if path not in conflicts]:
+        try:
+            stream_file(source_path, args.output_dir, Transpiler(), profiler)
+        except Exception as e:
+            print(f"{location(source_path, getattr(e, 'line', None), getattr(e, 'column', None))}: "
+                  f"{type(e).__name__}: {e}", file=sys.stderr)
+            succeeded = False
+elif args.async_io:
+    results, throughput = run(build_async(args.files, args.output_dir, jobs, options, args.io_concurrency,
+                                      args.queue_depth))
+    succeeded = all(result.is_success() for result in results)
+    print(throughput.summary())
+else:
+    results = build(args.files, args.output_dir, jobs, options)
+    succeeded = all(result.is_success() for result in results)
+    if cache and not profiler:
+        print(cache_statistics(results))
+
+if profiler:
+    print(profiler.summary(), file=sys.stderr if args.stream else sys.stdout)
+    if args.profile_json:
+        with open(args.profile_json, 'w') as f:
+            json.dump(profiler.to_json(), f, indent=2)
+    if args.profile_pass:
+        profiler.dump_cprofile(args.profile_dump)
+
+if not succeeded:
+    sys.exit(1)
@@ -0,0 +1,50 @@
+from concurrent.futures import ProcessPoolExecutor, Executor
+from itertools import repeat
+from typing import Dict, Optional
+
+from fortiori.cache import BuildCache
+from fortiori.incremental import IncrementalTranspiler, transpile_units
+from fortiori.modules import DependencyGraph, summarize
+from fortiori.profiling import PipelineProfiler
+from fortiori.transpiler import Transpiler
+
+_transpiler = Transpiler()
+_incremental_transpiler = IncrementalTranspiler(_transpiler)
+
+
+def transpile(text: str, incremental: bool = False, signatures: Optional[Dict[str, Optional[str]]] = None,
+              cache: Optional[BuildCache] = None, profiler: Optional[PipelineProfiler] = None,
+              executor: Optional[Executor] = None, jobs: int = 1) -> str:
+    """Transpiles the text of one file with the default operations. Warnings are printed to stderr.
+    incremental : Memoize the output of each program unit, so that transpiling an edited text only transpiles
+    the units which changed.
+    signatures : Functions visible to the text, including those of the modules it uses. Computed from the text
+    when missing.
+    cache : Also persists unit outputs between processes, when incremental.
+    executor : Transpiles the program units of the text in parallel on it, with the number of workers given by
+    jobs, when neither incremental nor profiled. The output is the same."""
+    if executor is not None and not incremental and profiler is None:
+        return transpile_units(_transpiler, text, executor, jobs, signatures)
+    if not incremental:
+        return _transpiler.transpile(text, signatures, profiler)
+    _incremental_transpiler.cache = cache
+    return _incremental_transpiler.transpile(text, signatures, profiler)
+
+
+def transpile_many(sources: Dict[str, str], jobs: int = 1) -> Dict[str, str]:
+    """Transpiles texts which may use each other's modules.
+    sources : Text of each file, by name, e.g. its path.
+    Raises the first TranslationException encountered."""
+    graph = DependencyGraph({name: summarize(text) for name, text in sources.items()})
+    names = list(sources)
+    texts = [sources[name] for name in names]
+    signatures = [graph.signatures(name) for name in names]
+    if jobs <= 1 or len(sources) <= 1:
+        return dict(zip(names, map(transpile, texts, repeat(False), signatures)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return dict(zip(names, executor.map(transpile, texts, repeat(False), signatures)))
+
+
+def configuration() -> str:
+    """Identifies the default operations, e.g. for cache keys."""
+    return _transpiler.configuration()
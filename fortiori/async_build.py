@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Executor
+from typing import List, Dict, Tuple
+
+from fortiori.build import BuildOptions, FileResult, output_path, transpile_source, write_if_changed, \
+    persist_identifier_encodings, output_conflicts
+from fortiori.compat import running_loop
+
+_DONE = None
+
+
+class Throughput(object):
+
+    def __init__(self):
+        self.files = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+
+    def summary(self) -> str:
+        seconds = self.seconds or 1e-9
+        return f"{self.files} file(s) in {self.seconds:.3f}s: {self.files / seconds:.1f} files/s, " \
+               f"{self.bytes_read / seconds / 1e6:.2f} MB/s read, {self.bytes_written / seconds / 1e6:.2f} MB/s written"
+
+
+async def build_async(source_paths: List[str], output_dir: str, jobs: int = 1, options: BuildOptions = BuildOptions(),
+                      io_concurrency: int = 8, queue_depth: int = 16) -> Tuple[List[FileResult], Throughput]:
+    """Overlaps reading, transpiling and writing. Readers prefetch inputs on a thread pool while the transpilers run
+    on worker processes, or on a single thread when jobs is 1, and writers store outputs as they come.
+    Each file is transpiled on its own: functions of modules used from other files are not resolved, which only
+    affects warnings.
+    io_concurrency : Reads, and writes, in flight at once.
+    queue_depth : Texts waiting between two stages. With the number of workers, bounds the memory in use."""
+    os.makedirs(output_dir, exist_ok=True)
+    loop = running_loop()
+    throughput = Throughput()
+    results: Dict[str, FileResult] = {source_path: FileResult(source_path, error=error)
+                                      for source_path, error in output_conflicts(source_paths, output_dir).items()}
+    pending_paths = iter([source_path for source_path in source_paths if source_path not in results])
+    texts: asyncio.Queue = asyncio.Queue(maxsize=queue_depth)
+    transpiled: asyncio.Queue = asyncio.Queue(maxsize=queue_depth)
+
+    async def read():
+        for source_path in pending_paths:
+            try:
+                text, size = await loop.run_in_executor(io_executor, _read, source_path)
+                throughput.bytes_read += size
+                await texts.put(FileResult(source_path, text=text))
+            except Exception as e:
+                await texts.put(FileResult(source_path, error=f"{type(e).__name__}: {e}"))
+
+    async def transpile():
+        while True:
+            source = await texts.get()
+            if source is _DONE:
+                return
+            if source.is_success():
+                source = await loop.run_in_executor(cpu_executor, transpile_source, source.source_path,
+                                                    source.text, options)
+            await transpiled.put(source)
+
+    async def write():
+        while True:
+            result = await transpiled.get()
+            if result is _DONE:
+                return
+            if result.is_success():
+                try:
+                    throughput.bytes_written += await loop.run_in_executor(
+                        io_executor, _write, output_path(result.source_path, output_dir), result.text)
+                except Exception as e:
+                    result = FileResult(result.source_path, error=f"{type(e).__name__}: {e}")
+            results[result.source_path] = result
+            throughput.files += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=io_concurrency) as io_executor, _cpu_executor(jobs, options) as cpu_executor:
+        workers = max(jobs, 1) if options.profiler is None else 1
+        writers = [asyncio.ensure_future(write()) for _ in range(io_concurrency)]
+        transpilers = [asyncio.ensure_future(transpile()) for _ in range(workers)]
+        await asyncio.gather(*[read() for _ in range(io_concurrency)])
+        for _ in transpilers:
+            await texts.put(_DONE)
+        await asyncio.gather(*transpilers)
+        for _ in writers:
+            await transpiled.put(_DONE)
+        await asyncio.gather(*writers)
+    throughput.seconds = time.perf_counter() - start
+
+    ordered = [results[source_path] for source_path in source_paths]
+    for result in ordered:
+        if not result.is_success():
+            print(result.describe(), file=sys.stderr)
+    if options.cache and jobs <= 1:
+        persist_identifier_encodings(options.cache)
+    return ordered, throughput
+
+
+def _cpu_executor(jobs: int, options: BuildOptions) -> Executor:
+    if jobs <= 1 or options.profiler is not None:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(max_workers=jobs)
+
+
+def _read(source_path: str) -> Tuple[str, int]:
+    with open(source_path, 'r') as f:
+        return f.read(), os.fstat(f.fileno()).st_size
+
+
+def _write(path: str, text: str) -> int:
+    write_if_changed(path, text)
+    return os.path.getsize(path)
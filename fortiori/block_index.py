@@ -0,0 +1,28 @@
+from bisect import bisect_right
+from typing import List, Optional, Dict
+
+from fortiori.syntax import SyntaxTree, Block
+
+
+class BlockIndex(object):
+
+    def __init__(self, tree: SyntaxTree):
+        """Lookup tables over the blocks of a parsed text, in source order."""
+        self.blocks: List[Block] = list(tree.blocks())
+        self.top_level_blocks: List[Block] = [block for block in self.blocks if block.parent is None]
+        self._by_opening_bracket: Dict[int, Block] = {block.opening_bracket.position: block for block in self.blocks}
+        self._openings = [block.opening_bracket.position for block in self.blocks]
+
+    def block_opened_at(self, bracket_position: int) -> Optional[Block]:
+        return self._by_opening_bracket.get(bracket_position)
+
+    def blocks_of_type(self, block_type: str) -> List[Block]:
+        return [block for block in self.blocks if block.block_type == block_type]
+
+    def enclosing_block(self, position: int) -> Optional[Block]:
+        """Innermost block whose brackets surround the position."""
+        i = bisect_right(self._openings, position) - 1
+        block = self.blocks[i] if i >= 0 else None
+        while block is not None and block.block_end < position:
+            block = block.parent
+        return block
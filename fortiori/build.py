@@ -0,0 +1,264 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, Executor
+from functools import partial
+from itertools import repeat, chain
+from typing import List, Optional, Dict, Callable, ContextManager, Tuple, Iterable
+
+from fortiori import api
+from fortiori.cache import BuildCache, CacheEntry
+from fortiori.compat import nullcontext
+from fortiori.exceptions import CyclicModuleDependencyException, ConflictingOutputPathException
+from fortiori.modules import FileInterface, DependencyGraph, summarize
+from fortiori.profiling import PipelineProfiler
+from fortiori.tree_operations import identifier_encodings
+
+OUTPUT_EXTENSION = ".f90"
+INTERFACE_CONFIGURATION = "interface"
+
+_loaded_identifier_encodings = set()
+
+
+class BuildOptions(object):
+
+    def __init__(self, cache: Optional[BuildCache] = None, incremental: bool = False,
+                 profiler: Optional[PipelineProfiler] = None, split_units: bool = False):
+        """incremental : Only transpile the program units which are not memoized yet.
+        profiler : Measures every pass. Files are then transpiled in this process and the cache is bypassed.
+        split_units : Transpile the program units of each file in parallel instead of the files, for builds of a
+        few large files. Ignored when incremental."""
+        self.cache = cache
+        self.incremental = incremental
+        self.profiler = profiler
+        self.split_units = split_units
+
+
+class FileResult(object):
+
+    def __init__(self, source_path: str, text: Optional[str] = None, error: Optional[str] = None,
+                 duration: float = 0.0, cached: bool = False, line: Optional[int] = None,
+                 column: Optional[int] = None):
+        """duration : Seconds spent transpiling. For cached results, the time the original transpilation took.
+        line, column : 1-based location of the error in the source, when known."""
+        self.source_path = source_path
+        self.text = text
+        self.error = error
+        self.duration = duration
+        self.cached = cached
+        self.line = line
+        self.column = column
+
+    def is_success(self) -> bool:
+        return self.error is None
+
+    def describe(self) -> str:
+        """The error prefixed with its location, as path:line:column: error."""
+        return f"{location(self.source_path, self.line, self.column)}: {self.error}"
+
+
+def location(source_path: str, line: Optional[int] = None, column: Optional[int] = None) -> str:
+    if line is None:
+        return source_path
+    return f"{source_path}:{line}" if column is None else f"{source_path}:{line}:{column}"
+
+
+def output_path(source_path: str, output_dir: str) -> str:
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(source_path))[0] + OUTPUT_EXTENSION)
+
+
+def output_conflicts(source_paths: List[str], output_dir: str, other_paths: Iterable[str] = ()) -> Dict[str, str]:
+    """Error of each file whose output path is also the output path of another file, among the files and the other
+    paths. Outputs are named after the base name of their source only, so such files would overwrite each other."""
+    owners: Dict[str, Dict[str, str]] = {}
+    for path in chain(source_paths, other_paths):
+        owners.setdefault(output_path(path, output_dir), {}).setdefault(os.path.realpath(path), path)
+    conflicts = {}
+    for path in source_paths:
+        output = output_path(path, output_dir)
+        others = [other for real_path, other in owners[output].items() if real_path != os.path.realpath(path)]
+        if others:
+            conflicts[path] = f"{ConflictingOutputPathException.__name__}: {output} is also the output of " \
+                              f"{', '.join(others)}"
+    return conflicts
+
+
+def transpile_file(source_path: str, options: BuildOptions = BuildOptions(),
+                   signatures: Optional[Dict[str, Optional[str]]] = None, executor: Optional[Executor] = None,
+                   jobs: int = 1) -> FileResult:
+    """signatures : Functions visible to the file, including those of the modules it uses. Computed from the file
+    alone when missing.
+    executor : Transpiles the program units of the file in parallel on it, with jobs workers."""
+    try:
+        with open(source_path, 'r') as f:
+            text = f.read()
+    except Exception as e:
+        return FileResult(source_path, error=f"{type(e).__name__}: {e}")
+    return transpile_source(source_path, text, options, signatures, executor, jobs)
+
+
+def transpile_source(source_path: str, text: str, options: BuildOptions = BuildOptions(),
+                     signatures: Optional[Dict[str, Optional[str]]] = None, executor: Optional[Executor] = None,
+                     jobs: int = 1) -> FileResult:
+    """Same as transpile_file, for a text which was already read. source_path only identifies the result."""
+    try:
+        cache = options.cache if options.profiler is None else None
+        configuration = api.configuration()
+        if signatures is not None:
+            configuration += json.dumps(signatures, sort_keys=True)
+        key = cache.key(text, configuration) if cache else None
+        entry = cache.load(key) if cache else None
+        if entry is not None:
+            return FileResult(source_path, text=entry.text, duration=entry.duration, cached=True)
+
+        if cache:
+            _load_identifier_encodings(cache)
+        if options.profiler is not None:
+            options.profiler.current_file = source_path
+        start = time.perf_counter()
+        transpiled = api.transpile(text, options.incremental, signatures, options.cache, options.profiler, executor,
+                                   jobs)
+        duration = time.perf_counter() - start
+        if cache:
+            cache.store(key, CacheEntry(transpiled, duration))
+        return FileResult(source_path, text=transpiled, duration=duration)
+    except Exception as e:
+        return FileResult(source_path, error=f"{type(e).__name__}: {e}", line=getattr(e, "line", None),
+                          column=getattr(e, "column", None))
+
+
+def summarize_file(source_path: str, cache: Optional[BuildCache] = None) -> Optional[FileInterface]:
+    """None when the file cannot be read or parsed. Transpiling it then reports why."""
+    try:
+        with open(source_path, 'r') as f:
+            text = f.read()
+
+        key = cache.key(text, INTERFACE_CONFIGURATION) if cache else None
+        entry = cache.load(key) if cache else None
+        if entry is not None:
+            return FileInterface.from_json(entry.text)
+
+        interface = summarize(text)
+        if cache:
+            cache.store(key, CacheEntry(interface.to_json(), 0.0))
+        return interface
+    except Exception:
+        return None
+
+
+def _load_identifier_encodings(cache: BuildCache):
+    """Once per process and cache directory, so that every worker starts from the persisted table."""
+    if cache.cache_dir not in _loaded_identifier_encodings:
+        _loaded_identifier_encodings.add(cache.cache_dir)
+        identifier_encodings.update(cache.load_identifier_encodings())
+
+
+def transpile_files(source_paths: List[str], jobs: int = 1, options: BuildOptions = BuildOptions(),
+                    executor: Optional[Executor] = None,
+                    signatures: Optional[List[Optional[Dict[str, Optional[str]]]]] = None) -> List[FileResult]:
+    """One result per file, in the order the files were given.
+    executor : Long-lived executor to use instead of a pool created for this call.
+    signatures : Functions visible to each file."""
+    signatures = signatures if signatures is not None else [None] * len(source_paths)
+    with _executor(jobs, len(source_paths), options, executor) as executor:
+        if options.split_units and executor is not None:
+            return [transpile_file(source_path, options, file_signatures, executor, jobs)
+                    for source_path, file_signatures in zip(source_paths, signatures)]
+        return _map(transpile_file, executor, source_paths, repeat(options), signatures)
+
+
+def summarize_files(source_paths: List[str], jobs: int = 1, options: BuildOptions = BuildOptions(),
+                    executor: Optional[Executor] = None) -> Dict[str, FileInterface]:
+    """Interfaces of the files which could be read and parsed, in the order the files were given."""
+    with _executor(jobs, len(source_paths), options, executor) as executor:
+        interfaces = _map(partial(summarize_file, cache=options.cache), executor, source_paths)
+    return {path: interface for path, interface in zip(source_paths, interfaces) if interface is not None}
+
+
+def build(source_paths: List[str], output_dir: str, jobs: int = 1, options: BuildOptions = BuildOptions(),
+          executor: Optional[Executor] = None, graph: Optional[DependencyGraph] = None) -> List[FileResult]:
+    """Transpiles the files level by level, each file after the files defining the modules it uses. The files of a
+    level are transpiled in parallel. Results keep the order the files were given in. Files whose output path is
+    also the output of another source fail without being transpiled.
+    graph : Dependency graph of every source, when the files are only some of them. Built from the files when
+    missing."""
+    os.makedirs(output_dir, exist_ok=True)
+    results: Dict[str, FileResult] = {}
+    with _executor(jobs, len(source_paths), options, executor) as executor:
+        if graph is None:
+            graph = DependencyGraph(summarize_files(source_paths, jobs, options, executor))
+        for source_path, error in output_conflicts(source_paths, output_dir, graph.interfaces).items():
+            results[source_path] = FileResult(source_path, error=error)
+        levels, cyclic = _levels(graph, [path for path in source_paths if path not in results])
+        for source_path in cyclic:
+            results[source_path] = FileResult(source_path, error=f"{CyclicModuleDependencyException.__name__}: "
+                                                                 f"module dependency cycle among {', '.join(cyclic)}")
+        for level in levels:
+            signatures = [graph.signatures(path) if path in graph.interfaces else None for path in level]
+            for result in transpile_files(level, jobs, options, executor, signatures):
+                if result.is_success():
+                    write_if_changed(output_path(result.source_path, output_dir), result.text)
+                results[result.source_path] = result
+
+    ordered = [results[source_path] for source_path in source_paths]
+    for result in ordered:
+        if not result.is_success():
+            print(result.describe(), file=sys.stderr)
+    if options.cache:
+        persist_identifier_encodings(options.cache)
+    return ordered
+
+
+def persist_identifier_encodings(cache: BuildCache):
+    """Stores the identifier table of this process when new identifiers were encoded since it was loaded."""
+    if identifier_encodings.new_encodings:
+        cache.store_identifier_encodings(identifier_encodings.encodings())
+        identifier_encodings.new_encodings = 0
+
+
+def _levels(graph: DependencyGraph, source_paths: List[str]) -> Tuple[List[List[str]], List[str]]:
+    """Files without an interface are transpiled first, so that their errors get reported."""
+    unknown = [path for path in source_paths if path not in graph.interfaces]
+    try:
+        levels, cyclic = graph.levels(source_paths), []
+    except CyclicModuleDependencyException as e:
+        cyclic = e.args[0]
+        levels = graph.levels([path for path in source_paths if path not in cyclic])
+    if unknown:
+        levels = [unknown + (levels[0] if levels else [])] + levels[1:]
+    return levels, cyclic
+
+
+def _executor(jobs: int, task_count: int, options: BuildOptions,
+              executor: Optional[Executor]) -> ContextManager[Optional[Executor]]:
+    """The given executor, a process pool for this call, or None to run in this process."""
+    if options.profiler is not None:
+        return nullcontext(None)
+    if executor is not None or jobs <= 1 or (task_count <= 1 and not options.split_units):
+        return nullcontext(executor)
+    return ProcessPoolExecutor(max_workers=jobs)
+
+
+def _map(function: Callable, executor: Optional[Executor], *iterables) -> list:
+    return list(executor.map(function, *iterables) if executor is not None else map(function, *iterables))
+
+
+def write_if_changed(path: str, text: str) -> bool:
+    """Leaves identical outputs untouched so that their timestamps do not trigger downstream rebuilds."""
+    try:
+        with open(path, 'r') as f:
+            if f.read() == text:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    with open(path, 'w') as outfile:
+        outfile.write(text)
+    return True
+
+
+def cache_statistics(results: List[FileResult]) -> str:
+    hits = sum(1 for result in results if result.cached)
+    misses = sum(1 for result in results if result.is_success() and not result.cached)
+    saved = sum(result.duration for result in results if result.cached)
+    return f"cache: {hits} hits, {misses} misses, {saved:.3f}s saved"
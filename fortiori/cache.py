@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Optional, Dict
+
+from fortiori import __version__
+
+_UNRELEASED_VERSION = "@@VERSION@@"
+_IDENTIFIER_ENCODINGS_FILE = "identifiers.json"
+
+
+class CacheEntry(object):
+
+    def __init__(self, text: str, duration: float):
+        """duration : Seconds the transpilation took when the entry was stored."""
+        self.text = text
+        self.duration = duration
+
+
+class BuildCache(object):
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def key(self, text: str, configuration: str) -> str:
+        digest = hashlib.sha256()
+        for part in (code_version(), configuration, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key), 'r', encoding="utf-8") as f:
+                entry = json.load(f)
+            return CacheEntry(entry["text"], entry["duration"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, key: str, entry: CacheEntry):
+        self._write(self._path(key), {"text": entry.text, "duration": entry.duration})
+
+    def load_identifier_encodings(self) -> Dict[str, str]:
+        """Encodings stored by a build of the same transpiler version, or an empty table."""
+        try:
+            with open(os.path.join(self.cache_dir, _IDENTIFIER_ENCODINGS_FILE), 'r', encoding="utf-8") as f:
+                table = json.load(f)
+            return table["encodings"] if table["version"] == code_version() else {}
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def store_identifier_encodings(self, encodings: Dict[str, str]):
+        self._write(os.path.join(self.cache_dir, _IDENTIFIER_ENCODINGS_FILE),
+                    {"version": code_version(), "encodings": encodings})
+
+    def _write(self, path: str, content: dict):
+        """Written to a temporary file first so that concurrent workers never read a partial file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'w', encoding="utf-8") as f:
+            json.dump(content, f)
+        os.replace(temporary_path, path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """The released version, or a hash of the package sources for development checkouts."""
+    if __version__ != _UNRELEASED_VERSION:
+        return __version__
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith(".py"):
+            with open(os.path.join(package_dir, name), 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
@@ -0,0 +1,39 @@
+import asyncio
+import tracemalloc
+from contextlib import contextmanager
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+try:
+    from contextlib import nullcontext
+except ImportError:  # Python 3.6
+    @contextmanager
+    def nullcontext(enter_result=None):
+        yield enter_result
+
+
+def run(coroutine: Awaitable[T]) -> T:
+    """asyncio.run, on a new event loop closed afterwards."""
+    if hasattr(asyncio, "run"):
+        return asyncio.run(coroutine)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def running_loop() -> asyncio.AbstractEventLoop:
+    """asyncio.get_running_loop. Only called from a coroutine, where get_event_loop returns the same loop."""
+    return asyncio.get_running_loop() if hasattr(asyncio, "get_running_loop") else asyncio.get_event_loop()
+
+
+def reset_traced_peak():
+    """Sets the peak traced by tracemalloc to the memory in use. Before Python 3.9, restarts tracing instead, which
+    also forgets the memory in use: read it after this call."""
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.stop()
+        tracemalloc.start()
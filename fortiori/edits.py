@@ -1,24 +1,92 @@
-from typing import List
+from contextlib import contextmanager
+from typing import List, Iterator, Tuple
 
 from jivago_streams import Stream
 
+from fortiori.exceptions import OverlappingCodeEditsException
+
 
 class CodeEdit(object):
+    __slots__ = ("start_pos", "end_pos", "inserted_text")
 
     def __init__(self, start_pos: int, end_pos: int, inserted_text: str):
         self.start_pos = start_pos
         self.end_pos = end_pos
         self.inserted_text = inserted_text
 
-    def _apply(self, text: str) -> str:
-        return text[:self.start_pos] + self.inserted_text + text[self.end_pos:]
+
+class EditCounter(object):
+
+    def __init__(self):
+        """produced : Edits passed to apply_edits.
+        applied : Edits which actually changed the text."""
+        self.produced = 0
+        self.applied = 0
+
+
+# Text, edits applied to it and result of an apply_edits call.
+EditedText = Tuple[str, List[CodeEdit], str]
+
+
+class EditRecorder(object):
+
+    def __init__(self):
+        """calls : Every apply_edits call, in order."""
+        self.calls: List[EditedText] = []
+
+
+_edit_counters: List[EditCounter] = []
+_edit_recorders: List[EditRecorder] = []
+
+
+@contextmanager
+def count_edits() -> Iterator[EditCounter]:
+    """Counts the edits of every apply_edits call made inside the block."""
+    counter = EditCounter()
+    _edit_counters.append(counter)
+    try:
+        yield counter
+    finally:
+        _edit_counters.remove(counter)
+
+
+@contextmanager
+def record_edits() -> Iterator[EditRecorder]:
+    """Records the edits of every apply_edits call made inside the block, e.g. to follow positions through them."""
+    recorder = EditRecorder()
+    _edit_recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _edit_recorders.remove(recorder)
 
 
 def apply_edits(text: str, edits: List[CodeEdit]) -> str:
-    edited = text
-    for edit in sorted(edits, key=lambda edit: edit.start_pos, reverse=True):
-        edited = edit._apply(edited)
-    return edited
+    """Applies a batch of edits in a single pass over the original text.
+    Insertions sharing a position are kept in the order they were given. Any other overlap is an error."""
+    if _edit_counters:
+        _count_edits(text, edits)
+    pieces: List[str] = []
+    position = 0
+    for edit in sorted(edits, key=lambda edit: (edit.start_pos, edit.end_pos)):
+        if edit.start_pos < position:
+            raise OverlappingCodeEditsException(edit.start_pos, edit.end_pos, edit.inserted_text,
+                                                position=edit.start_pos)
+        pieces.append(text[position:edit.start_pos])
+        pieces.append(edit.inserted_text)
+        position = edit.end_pos
+    pieces.append(text[position:])
+    result = "".join(pieces)
+    for recorder in _edit_recorders:
+        recorder.calls.append((text, edits, result))
+    return result
+
+
+def _count_edits(text: str, edits: List[CodeEdit]):
+    applied = sum(1 for edit in edits if text[edit.start_pos:edit.end_pos] != edit.inserted_text)
+    for counter in _edit_counters:
+        counter.produced += len(edits)
+        counter.applied += applied
 
 
 def remove_unused_whitespace(text: str) -> str:
@@ -0,0 +1,63 @@
+import re
+from typing import TextIO, Union, List
+
+from fortiori.syntax import SyntaxTree
+
+CHUNK_SIZE = 65536
+
+
+class _SeparatorCollapse(object):
+
+    def __init__(self, separator: str):
+        """Collapses runs of the separator into one and drops them at both ends of the whole text, one chunk at a
+        time. A run split between two chunks is collapsed as well."""
+        self.separator = separator
+        self._run = re.compile(re.escape(separator) + "+")
+        self._started = False
+        self._pending = False
+
+    def feed(self, chunk: str) -> str:
+        collapsed = self._run.sub(self.separator, chunk)
+        body = collapsed.strip(self.separator)
+        if not body:
+            self._pending = self._pending or collapsed != ""
+            return ""
+        leading = self.separator if self._started and (self._pending or collapsed[0] == self.separator) else ""
+        self._started = True
+        self._pending = collapsed[-1] == self.separator
+        return leading + body
+
+
+class NormalizingWriter(object):
+
+    def __init__(self, sink: TextIO):
+        """Writes text to the sink as remove_unused_whitespace would return it: repeated spaces collapsed, blank
+        lines removed, without leading or trailing whitespace. Separators held back at the end are never written."""
+        self.sink = sink
+        self._spaces = _SeparatorCollapse(" ")
+        self._newlines = _SeparatorCollapse("\n")
+
+    def write(self, text: str):
+        normalized = self._newlines.feed(self._spaces.feed(text))
+        if normalized:
+            self.sink.write(normalized)
+
+
+def emit_normalized(source: Union[str, SyntaxTree], sink: TextIO, chunk_size: int = CHUNK_SIZE):
+    """Writes a text, or the tokens of a tree, straight to the sink with the whitespace normalised, in chunks of
+    about chunk_size characters instead of building the whole output first."""
+    writer = NormalizingWriter(sink)
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            writer.write(source[start:start + chunk_size])
+        return
+
+    chunk: List[str] = []
+    size = 0
+    for token in source.tokens:
+        chunk.append(token.text)
+        size += len(token.text)
+        if size >= chunk_size:
+            writer.write("".join(chunk))
+            chunk, size = [], 0
+    writer.write("".join(chunk))
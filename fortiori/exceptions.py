@@ -1,10 +1,44 @@
+from typing import Optional
+
+
 class TranslationException(Exception):
+
+    def __init__(self, *args, position: Optional[int] = None):
+        """position : Offset of the error in the text being transpiled, when known. The transpiler converts it to
+        the 1-based line and column of the source."""
+        super().__init__(*args)
+        self.position = position
+        self.line: Optional[int] = None
+        self.column: Optional[int] = None
+
+    def locate(self, line: int, column: int):
+        self.line, self.column = line, column
+
+    def shift(self, lines: int):
+        """Moves the location down by a number of lines, e.g. from a program unit to the file containing it."""
+        if self.line is not None:
+            self.line += lines
+
+
+class CannotFindSymbolDeclarationException(TranslationException):
+    pass
+
+
+class InvalidSymbolTypeDeclarationException(TranslationException):
+    pass
+
+
+class OverlappingCodeEditsException(TranslationException):
+    pass
+
+
+class UnbalancedBracketException(TranslationException):
     pass
 
 
-class CannotFindSymbolDeclarationException(Exception):
+class CyclicModuleDependencyException(TranslationException):
     pass
 
 
-class InvalidSymbolTypeDeclarationException(Exception):
+class ConflictingOutputPathException(Exception):
     pass
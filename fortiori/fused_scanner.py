@@ -0,0 +1,105 @@
+import re
+from functools import lru_cache
+from typing import Callable, List, Tuple, Optional, Match
+
+from fortiori.block_index import BlockIndex
+from fortiori.edits import CodeEdit, apply_edits
+from fortiori.lexical import LexicalIndex
+from fortiori.symbols import SymbolTable
+from fortiori.syntax import parse, SyntaxTree
+
+
+class ScanContext(object):
+
+    def __init__(self, text: str, tree: Optional[SyntaxTree] = None):
+        """Indexes of the scanned text shared by every handler, each built the first time a handler needs it.
+        tree : Syntax tree of the text, when already parsed."""
+        self.text = text
+        self._lexical_index: Optional[LexicalIndex] = None
+        self._tree = tree
+        self._block_index: Optional[BlockIndex] = None
+        self._symbol_table: Optional[SymbolTable] = None
+
+    @property
+    def lexical_index(self) -> LexicalIndex:
+        if self._lexical_index is None:
+            self._lexical_index = LexicalIndex(self.text)
+        return self._lexical_index
+
+    @property
+    def block_index(self) -> BlockIndex:
+        if self._block_index is None:
+            self._block_index = BlockIndex(self._parsed())
+        return self._block_index
+
+    @property
+    def symbol_table(self) -> SymbolTable:
+        """Without function signatures."""
+        if self._symbol_table is None:
+            self._symbol_table = SymbolTable(self._parsed(), {})
+        return self._symbol_table
+
+    def _parsed(self) -> SyntaxTree:
+        if self._tree is None:
+            self._tree = parse(self.text)
+        return self._tree
+
+
+class ScanHandler(object):
+
+    def __init__(self, name: str, pattern: str, handle: Callable[[Match, ScanContext], List[CodeEdit]],
+                 triggers: Tuple[str, ...]):
+        """pattern : Multiline regular expression. The handler receives the same matches as pattern.finditer.
+        triggers : Substrings without which the pattern cannot match, as for an Operation."""
+        self.name = name
+        self.regex = re.compile(pattern, flags=re.M)
+        self.handle = handle
+        self.triggers = triggers
+
+    def is_triggered_by(self, text: str) -> bool:
+        return any(trigger in text for trigger in self.triggers)
+
+
+class FusedScanner(object):
+
+    def __init__(self, handlers: Tuple[ScanHandler, ...]):
+        """Walks the text once for every handler, with an alternation of their patterns wrapped in lookaheads,
+        so that a match of one handler cannot hide a match of another starting inside it. The handlers must not
+        both match at the same position."""
+        self.handlers = handlers
+        self._alternation = re.compile("|".join([f"(?=(?P<h{i}>{handler.regex.pattern}))"
+                                                 for i, handler in enumerate(handlers)]), flags=re.M)
+
+    def edits(self, text: str, tree: Optional[SyntaxTree] = None) -> List[CodeEdit]:
+        context = ScanContext(text, tree)
+        if len(self.handlers) == 1:
+            handler = self.handlers[0]
+            return [edit for match in handler.regex.finditer(text) for edit in handler.handle(match, context)]
+
+        edits: List[CodeEdit] = []
+        resume_positions = [0] * len(self.handlers)
+        for candidate in self._alternation.finditer(text):
+            i = int(candidate.lastgroup[1:])
+            start = candidate.start()
+            if start < resume_positions[i]:
+                continue
+            handler = self.handlers[i]
+            match = handler.regex.match(text, start)
+            resume_positions[i] = max(match.end(), start + 1)
+            edits.extend(handler.handle(match, context))
+        return edits
+
+
+def scan(text: str, handlers: Tuple[ScanHandler, ...], tree: Optional[SyntaxTree] = None) -> str:
+    """Applies the edits of every handler triggered by the text, found in a single scan. Same result as running
+    the handlers one after the other, provided their edits do not overlap and no handler depends on another's.
+    tree : Syntax tree of the text, when already parsed."""
+    triggered = tuple(handler for handler in handlers if handler.is_triggered_by(text))
+    if not triggered:
+        return text
+    return apply_edits(text, _scanner(triggered).edits(text, tree))
+
+
+@lru_cache(maxsize=None)
+def _scanner(handlers: Tuple[ScanHandler, ...]) -> FusedScanner:
+    return FusedScanner(handlers)
@@ -0,0 +1,179 @@
+import hashlib
+import io
+import json
+import math
+import re
+from collections import OrderedDict
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from itertools import repeat, chain
+from typing import List, Optional, Dict, Iterable, Iterator, Tuple
+
+from fortiori.cache import BuildCache, CacheEntry
+from fortiori.exceptions import UnbalancedBracketException, TranslationException
+from fortiori.lexical import STRING_LITERAL, COMMENT
+from fortiori.lines import locating_errors
+from fortiori.profiling import PipelineProfiler
+from fortiori.simple_operations import function_signatures, strip_comments
+from fortiori.transpiler import Transpiler
+
+_BRACKET = re.compile(f"{STRING_LITERAL}|{COMMENT}|[{{}}]", flags=re.M)
+UNIT_BATCHES_PER_JOB = 4
+
+
+def split_units(text: str) -> List[str]:
+    """Splits the text into chunks of whole lines, each ending on the line which closes a top-level program unit.
+    Units sharing a line stay in the same chunk, as does a unit whose header starts on the line closing the previous
+    one. Text after the last unit forms its own chunk, which transpiles to nothing when it only holds blank lines and
+    comments: join_outputs skips it."""
+    return list(iter_units(io.StringIO(text)))
+
+
+def iter_units(lines: Iterable[str]) -> Iterator[str]:
+    """Lazily groups lines into the chunks of split_units. Only the lines of the current chunk are kept."""
+    chunk: List[str] = []
+    open_brackets: List[Tuple[int, int, int]] = []
+    closed_unit = False
+    position = 0
+    for line_number, line in enumerate(lines, 1):
+        unit_end = 0
+        for match in _BRACKET.finditer(line):
+            if match.group() == "{":
+                open_brackets.append((position + match.start(), line_number, match.start() + 1))
+            elif match.group() == "}":
+                if not open_brackets:
+                    raise _unbalanced_bracket("unmatched '}'", position + match.start(), line_number,
+                                              match.start() + 1)
+                open_brackets.pop()
+                if not open_brackets:
+                    closed_unit, unit_end = True, match.end()
+        chunk.append(line)
+        position += len(line)
+        if closed_unit and not open_brackets:
+            closed_unit = False  # until the unit starting after the closing bracket closes, if any
+            if not _has_code_after(line, unit_end):
+                yield "".join(chunk)
+                chunk = []
+
+    if open_brackets:
+        raise _unbalanced_bracket("unclosed '{'", *open_brackets[-1])
+    if chunk:
+        yield "".join(chunk)
+
+
+class IncrementalTranspiler(object):
+
+    def __init__(self, transpiler: Transpiler, cache: Optional[BuildCache] = None, memo_size: int = 4096):
+        """Memoizes the output of each program unit by content hash, so only changed units are transpiled again.
+        With the default operations, the spliced output is identical to transpiling the whole file at once.
+        cache : Also persists unit outputs between processes.
+        memo_size : Number of unit outputs kept in memory."""
+        self.transpiler = transpiler
+        self.cache = cache
+        self.memo_size = memo_size
+        self._memo: Dict[str, str] = OrderedDict()
+
+    def transpile(self, text: str, signatures: Optional[Dict[str, Optional[str]]] = None,
+                  profiler: Optional[PipelineProfiler] = None) -> str:
+        """signatures : Functions visible to the text. Computed from the text when missing."""
+        signatures = _unit_signatures(self.transpiler, text, signatures)
+        configuration = self.transpiler.configuration()
+        if signatures is not None:
+            configuration += json.dumps(signatures, sort_keys=True)
+
+        outputs = []
+        for unit, lines_before in with_lines_before(split_units(text)):
+            with located_in_file(lines_before):
+                outputs.append(self._transpile_unit(unit, configuration, signatures, profiler))
+        return join_outputs(outputs)
+
+    def _transpile_unit(self, unit: str, configuration: str, signatures: Optional[Dict[str, Optional[str]]],
+                        profiler: Optional[PipelineProfiler]) -> str:
+        key = self.cache.key(unit, configuration) if self.cache \
+            else hashlib.sha256((configuration + "\0" + unit).encode("utf-8")).hexdigest()
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            return self._memo[key]
+
+        entry = self.cache.load(key) if self.cache else None
+        if entry is None:
+            entry = CacheEntry(self.transpiler.transpile(unit, signatures, profiler), 0.0)
+            if self.cache:
+                self.cache.store(key, entry)
+
+        self._memo[key] = entry.text
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return entry.text
+
+
+def transpile_units(transpiler: Transpiler, text: str, executor: Executor, jobs: int,
+                    signatures: Optional[Dict[str, Optional[str]]] = None) -> str:
+    """Transpiles the program units of the text on the executor and joins their outputs in order, identical to the
+    IncrementalTranspiler's. Consecutive units are sent in about UNIT_BATCHES_PER_JOB batches per job, so that the
+    signatures, computed once from the whole text when missing, are only sent once per batch."""
+    signatures = _unit_signatures(transpiler, text, signatures)
+    units = split_units(text)
+    batch_size = max(1, math.ceil(len(units) / (max(jobs, 1) * UNIT_BATCHES_PER_JOB)))
+    batches = [units[start:start + batch_size] for start in range(0, len(units), batch_size)]
+    lines_before = [0]
+    for batch in batches[:-1]:
+        lines_before.append(lines_before[-1] + sum(unit.count("\n") for unit in batch))
+    return join_outputs(chain.from_iterable(executor.map(_transpile_batch, repeat(transpiler), batches,
+                                                        repeat(signatures), lines_before)))
+
+
+def join_outputs(outputs: Iterable[str]) -> str:
+    """The outputs of consecutive units as the whole text would have been transpiled, one line apart. Units
+    without code have no output, and add no line."""
+    return "\n".join(output for output in outputs if output)
+
+
+def with_lines_before(units: Iterable[str], lines_before: int = 0) -> Iterator[Tuple[str, int]]:
+    """Each unit along with the number of lines preceding it in the file."""
+    for unit in units:
+        yield unit, lines_before
+        lines_before += unit.count("\n")
+
+
+@contextmanager
+def located_in_file(lines_before: int):
+    """Moves the location of errors raised in a unit to the file containing it."""
+    try:
+        yield
+    except TranslationException as e:
+        e.shift(lines_before)
+        raise
+
+
+def _transpile_batch(transpiler: Transpiler, units: List[str], signatures: Optional[Dict[str, Optional[str]]],
+                     lines_before: int) -> List[str]:
+    outputs = []
+    for unit, unit_lines_before in with_lines_before(units, lines_before):
+        with located_in_file(unit_lines_before):
+            outputs.append(transpiler.transpile(unit, signatures))
+    return outputs
+
+
+def _has_code_after(line: str, position: int) -> bool:
+    """Whether code other than a comment follows the position, outside any bracket."""
+    comment = _BRACKET.search(line, position)
+    end = comment.start() if comment is not None and comment.group().startswith("!") else len(line)
+    return bool(line[position:end].strip())
+
+
+def _unbalanced_bracket(message: str, position: int, line: int, column: int) -> UnbalancedBracketException:
+    exception = UnbalancedBracketException(message, position=position)
+    exception.locate(line, column)
+    return exception
+
+
+def _unit_signatures(transpiler: Transpiler, text: str,
+                     signatures: Optional[Dict[str, Optional[str]]]) -> Optional[Dict[str, Optional[str]]]:
+    """Signatures of the whole text for cross-unit pipelines, None otherwise."""
+    if not transpiler.is_cross_unit():
+        return None
+    if signatures is not None:
+        return signatures
+    with locating_errors(text):
+        return function_signatures(strip_comments(text))
@@ -0,0 +1,27 @@
+import re
+from bisect import bisect_left
+from typing import List
+
+STRING_LITERAL = r"\"[^\"\n]*(?:\"|$)|'[^'\n]*(?:'|$)"
+COMMENT = r"![^\n]*"
+
+_LEXICAL_ELEMENT = re.compile(STRING_LITERAL + "|" + COMMENT, flags=re.M)
+
+
+class LexicalIndex(object):
+
+    def __init__(self, text: str):
+        """Single scan of the string literals in the text, skipping comments so that their quotes open no string.
+        Strings end at their closing quote or at the end of the line. Comments run to the end of the line."""
+        self._string_starts: List[int] = []
+        self._string_ends: List[int] = []
+
+        for element in _LEXICAL_ELEMENT.finditer(text):
+            if text[element.start()] != "!":
+                self._string_starts.append(element.start())
+                self._string_ends.append(element.end())
+
+    def is_inside_string(self, position: int) -> bool:
+        """True for every character after an opening quote, up to and including the closing quote."""
+        i = bisect_left(self._string_starts, position) - 1
+        return i >= 0 and position < self._string_ends[i]
@@ -0,0 +1,80 @@
+import re
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from typing import List, Optional, Tuple, Iterator
+
+from fortiori.edits import CodeEdit
+from fortiori.exceptions import TranslationException
+
+_NEWLINE = re.compile("\n")
+
+
+class LineIndex(object):
+
+    def __init__(self, text: str):
+        """Offset at which each line of the text starts, found in a single scan. Every line also remembers the line
+        of the original text it comes from, so that positions in an edited text can be reported in the source."""
+        self.starts: List[int] = [0] + [newline.end() for newline in _NEWLINE.finditer(text)]
+        self.origins: List[int] = list(range(1, len(self.starts) + 1))
+        self.length = len(text)
+
+    def line_index(self, position: int) -> int:
+        """0-based index of the line containing the position."""
+        return bisect_right(self.starts, position) - 1
+
+    def location(self, position: int) -> Tuple[int, int]:
+        """1-based line of the original text and column in the current line. The column is exact as long as the
+        line was not edited before the position."""
+        i = self.line_index(position)
+        return self.origins[i], position - self.starts[i] + 1
+
+    def spans(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """(start, end) of each piece of text[start:end].split("\\n"), without slicing the text."""
+        end = self.length if end is None else end
+        for i in range(bisect_right(self.starts, start), bisect_left(self.starts, end + 1)):
+            yield start, self.starts[i] - 1
+            start = self.starts[i]
+        yield start, end
+
+    def after_edits(self, edits: List[CodeEdit]) -> "LineIndex":
+        """Index of apply_edits(text, edits), computed from this index and the inserted texts only. A line starting
+        right after an edit comes from the line where the edit ends, other lines created by an edit from the line
+        where it starts."""
+        starts, origins = [0], [self.origins[0]]
+        position, shift = 0, 0
+        for edit in sorted(edits, key=lambda edit: (edit.start_pos, edit.end_pos)):
+            first, last = bisect_right(self.starts, position), bisect_right(self.starts, edit.start_pos)
+            starts.extend([line_start + shift for line_start in self.starts[first:last]])
+            origins.extend(self.origins[first:last])
+
+            origin = self.origins[self.line_index(edit.start_pos)]
+            newline = edit.inserted_text.find("\n")
+            while newline != -1:
+                starts.append(edit.start_pos + shift + newline + 1)
+                origins.append(origin)
+                newline = edit.inserted_text.find("\n", newline + 1)
+            if starts[-1] == edit.start_pos + shift + len(edit.inserted_text):
+                # The line starting right after the edit shows the text which followed it in the original.
+                origins[-1] = self.origins[self.line_index(edit.end_pos)]
+
+            shift += len(edit.inserted_text) - (edit.end_pos - edit.start_pos)
+            position = edit.end_pos
+        first = bisect_right(self.starts, position)
+        starts.extend([line_start + shift for line_start in self.starts[first:]])
+        origins.extend(self.origins[first:])
+
+        index = LineIndex.__new__(LineIndex)
+        index.starts, index.origins, index.length = starts, origins, self.length + shift
+        return index
+
+
+@contextmanager
+def locating_errors(text: str):
+    """Gives the errors raised with a position in the text, and no location yet, the line and column of that
+    position."""
+    try:
+        yield
+    except TranslationException as e:
+        if e.position is not None and e.line is None:
+            e.locate(*LineIndex(text).location(e.position))
+        raise
@@ -0,0 +1,120 @@
+import json
+import re
+from typing import Dict, List, Optional, Set, Iterable
+
+from fortiori.block_index import BlockIndex
+from fortiori.exceptions import CyclicModuleDependencyException
+from fortiori.lexical import LexicalIndex
+from fortiori.simple_operations import function_signatures, strip_comments
+from fortiori.syntax import parse
+
+
+class ModuleInterface(object):
+
+    def __init__(self, name: str, functions: Dict[str, str], types: List[str]):
+        """functions : Return type of each function defined in the module."""
+        self.name = name
+        self.functions = functions
+        self.types = types
+
+
+class FileInterface(object):
+
+    def __init__(self, modules: List[ModuleInterface], uses: List[str], signatures: Dict[str, Optional[str]]):
+        """What other files need to know about a source file, without transpiling it.
+        uses : Modules named by the file's use statements.
+        signatures : Functions defined in the file, as returned by function_signatures."""
+        self.modules = modules
+        self.uses = uses
+        self.signatures = signatures
+
+    def to_json(self) -> str:
+        return json.dumps({"modules": [module.__dict__ for module in self.modules],
+                           "uses": self.uses,
+                           "signatures": self.signatures})
+
+    @staticmethod
+    def from_json(text: str) -> "FileInterface":
+        content = json.loads(text)
+        return FileInterface([ModuleInterface(module["name"], module["functions"], module["types"])
+                              for module in content["modules"]],
+                             content["uses"], content["signatures"])
+
+
+def summarize(text: str) -> FileInterface:
+    text = strip_comments(text)
+    modules = []
+    for module in BlockIndex(parse(text)).blocks_of_type("module"):
+        types = [block.name() for block in module.blocks() if block.block_type == "type"]
+        modules.append(ModuleInterface(module.name(),
+                                       function_signatures(module.block_content), types))
+
+    lexical_index = LexicalIndex(text)
+    uses = []
+    for use_statement in re.finditer(r"^\s*use\s+(\w+)", text, flags=re.M):
+        module_name = use_statement.group(1)
+        if not lexical_index.is_inside_string(use_statement.start(1)) and module_name not in uses:
+            uses.append(module_name)
+    return FileInterface(modules, uses, function_signatures(text))
+
+
+class DependencyGraph(object):
+
+    def __init__(self, interfaces: Dict[str, FileInterface]):
+        """interfaces : Interface of each source file. Modules which no file defines, such as intrinsic modules,
+        are ignored. When several files define a module, the first one provides it."""
+        self.interfaces = interfaces
+        self._providers: Dict[str, str] = {}
+        for path, interface in interfaces.items():
+            for module in interface.modules:
+                self._providers.setdefault(module.name, path)
+
+        self.dependencies: Dict[str, Set[str]] = {path: set() for path in interfaces}
+        self.dependents: Dict[str, Set[str]] = {path: set() for path in interfaces}
+        for path, interface in interfaces.items():
+            for module_name in interface.uses:
+                provider = self._providers.get(module_name)
+                if provider is not None and provider != path:
+                    self.dependencies[path].add(provider)
+                    self.dependents[provider].add(path)
+
+    def affected_by(self, changed_paths: Iterable[str]) -> Set[str]:
+        """The changed files and every file depending on them, directly or not."""
+        affected = set()
+        pending = [path for path in changed_paths if path in self.interfaces]
+        while pending:
+            path = pending.pop()
+            if path not in affected:
+                affected.add(path)
+                pending.extend(self.dependents[path])
+        return affected
+
+    def levels(self, paths: List[str]) -> List[List[str]]:
+        """Groups the files so that each one comes after the files it depends on. The files of a level do not depend
+        on each other and keep the order they were given in. Dependencies outside of the given files are ignored.
+        Raises CyclicModuleDependencyException with the files on or behind a cycle."""
+        remaining = [path for path in paths if path in self.interfaces]
+        levels = []
+        while remaining:
+            pending = set(remaining)
+            level = [path for path in remaining if not self.dependencies[path] & pending]
+            if not level:
+                raise CyclicModuleDependencyException(remaining)
+            levels.append(level)
+            built = set(level)
+            remaining = [path for path in remaining if path not in built]
+        return levels
+
+    def signatures(self, path: str) -> Dict[str, Optional[str]]:
+        """Functions visible to the file: its own, and those of the modules it uses, which map to None."""
+        interface = self.interfaces[path]
+        signatures = dict(interface.signatures)
+        for module_name in interface.uses:
+            provider = self._providers.get(module_name)
+            if provider is None:
+                continue
+            for module in self.interfaces[provider].modules:
+                if module.name == module_name:
+                    signatures.update({function_name: None for function_name in module.functions
+                                       if function_name not in signatures})
+        return signatures
@@ -1,2 +1,41 @@
+from typing import Callable, Tuple, Optional, Dict
+
+from fortiori.syntax import SyntaxTree
+
+
 class Operation(object):
-    pass
+
+    def __init__(self, name: str, function: Callable[..., str], triggers: Tuple[str, ...] = (),
+                 cross_unit: bool = False, parsed: bool = False):
+        """triggers : Substrings the operation reacts to. It is skipped when none of them occur in the text.
+        An operation without triggers always runs.
+        cross_unit : The function also takes the function signatures of the whole file, so that it can run on a
+        single program unit.
+        parsed : The function also takes the syntax tree of the text as tree, which it must not modify. The
+        transpiler parses the text once and updates the tree through the edits of each operation."""
+        self.name = name
+        self.function = function
+        self.triggers = triggers
+        self.cross_unit = cross_unit
+        self.parsed = parsed
+
+    def is_triggered_by(self, text: str) -> bool:
+        return not self.triggers or any(trigger in text for trigger in self.triggers)
+
+    def apply(self, text: str, signatures: Optional[Dict[str, Optional[str]]] = None,
+              tree: Optional[SyntaxTree] = None) -> str:
+        """tree : Syntax tree of the text, for parsed operations. They parse the text themselves when missing."""
+        arguments = (text, signatures) if self.cross_unit else (text,)
+        if self.parsed and tree is not None:
+            return self.function(*arguments, tree=tree)
+        return self.function(*arguments)
+
+
+class TreeOperation(Operation):
+
+    def __init__(self, name: str, function: Callable[[SyntaxTree], SyntaxTree]):
+        """Rewrites a syntax tree in place. Consecutive tree operations share a single parse."""
+        super().__init__(name, function)
+
+    def apply(self, tree: SyntaxTree) -> SyntaxTree:
+        return self.function(tree)
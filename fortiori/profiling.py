@@ -0,0 +1,100 @@
+import cProfile
+import time
+import tracemalloc
+from typing import List, Optional, Callable, Dict
+
+from fortiori.compat import reset_traced_peak
+from fortiori.edits import count_edits
+
+PARSE = "(parse)"
+EMIT = "(emit)"
+
+
+class PassRecord(object):
+
+    def __init__(self, file: Optional[str], name: str, seconds: float, input_size: Optional[int],
+                 output_size: Optional[int], edits_produced: int, edits_applied: int, peak_memory: Optional[int]):
+        """Sizes are in characters, None when the pass works on a syntax tree. peak_memory is in bytes above the
+        memory in use when the pass started, None when memory is not traced."""
+        self.file = file
+        self.name = name
+        self.seconds = seconds
+        self.input_size = input_size
+        self.output_size = output_size
+        self.edits_produced = edits_produced
+        self.edits_applied = edits_applied
+        self.peak_memory = peak_memory
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class PipelineProfiler(object):
+
+    def __init__(self, trace_memory: bool = True, cprofile_pass: Optional[str] = None):
+        """trace_memory : Record each pass's peak memory with tracemalloc. Slows every pass down.
+        cprofile_pass : Name of a pass to run under cProfile."""
+        self.trace_memory = trace_memory
+        self.cprofile_pass = cprofile_pass
+        self.cprofile = cProfile.Profile() if cprofile_pass else None
+        self.current_file: Optional[str] = None
+        self.records: List[PassRecord] = []
+
+    def measure(self, name: str, function: Callable, *args):
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            reset_traced_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        profiled = self.cprofile is not None and name == self.cprofile_pass
+
+        with count_edits() as edits:
+            if profiled:
+                self.cprofile.enable()
+            start = time.perf_counter()
+            try:
+                result = function(*args)
+            finally:
+                seconds = time.perf_counter() - start
+                if profiled:
+                    self.cprofile.disable()
+
+        peak_memory = tracemalloc.get_traced_memory()[1] - baseline if self.trace_memory else None
+        self.records.append(PassRecord(self.current_file, name, seconds, _size(args[0]), _size(result),
+                                       edits.produced, edits.applied, peak_memory))
+        return result
+
+    def summary(self) -> str:
+        """One line per pass, in the order the passes first ran, summed over every file."""
+        totals: Dict[str, List[PassRecord]] = {}
+        for record in self.records:
+            totals.setdefault(record.name, []).append(record)
+        total_seconds = sum(record.seconds for record in self.records) or 1.0
+
+        lines = [f"{'pass':<50}{'calls':>6}{'time (s)':>10}{'%':>6}{'in (KB)':>10}{'out (KB)':>10}"
+                 f"{'edits':>8}{'applied':>8}{'peak (KB)':>10}"]
+        for name, records in totals.items():
+            seconds = sum(record.seconds for record in records)
+            lines.append(f"{name:<50}{len(records):>6}{seconds:>10.4f}{100 * seconds / total_seconds:>6.1f}"
+                         f"{_kilobytes([record.input_size for record in records]):>10}"
+                         f"{_kilobytes([record.output_size for record in records]):>10}"
+                         f"{sum(record.edits_produced for record in records):>8}"
+                         f"{sum(record.edits_applied for record in records):>8}"
+                         f"{_kilobytes([record.peak_memory for record in records], max):>10}")
+        return "\n".join(lines)
+
+    def to_json(self) -> List[dict]:
+        return [record.to_dict() for record in self.records]
+
+    def dump_cprofile(self, path: str):
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(path)
+
+
+def _size(value) -> Optional[int]:
+    return len(value) if isinstance(value, str) else None
+
+
+def _kilobytes(values: List[Optional[int]], combine: Callable = sum) -> str:
+    known = [value for value in values if value is not None]
+    return f"{combine(known) / 1024:.1f}" if known else "-"
@@ -0,0 +1,29 @@
+import re
+from functools import lru_cache
+from typing import Iterator, Optional, Pattern, Match
+
+_PARENTHESIS = re.compile(r"[()]")
+
+
+def matching_parenthesis(text: str, position: int, depth: int = 1) -> Optional[int]:
+    """Position of the parenthesis closing the ones left open before the position, or None."""
+    for parenthesis in _PARENTHESIS.finditer(text, position):
+        depth += 1 if parenthesis.group() == "(" else -1
+        if depth == 0:
+            return parenthesis.start()
+    return None
+
+
+def find_line_matches(pattern: Pattern, text: str, start: int, end: int) -> Iterator[Match]:
+    """Same matches as pattern.finditer(text[start:end]), at their positions in the text, for a multiline pattern
+    starting with '^'. Unlike with the pos argument alone, '^' also matches at the start of the range."""
+    leading = _unanchored(pattern).match(text, start, end)
+    if leading is not None:
+        yield leading
+        start = max(leading.end(), start + 1)
+    yield from pattern.finditer(text, start, end)
+
+
+@lru_cache(maxsize=None)
+def _unanchored(pattern: Pattern) -> Pattern:
+    return re.compile(pattern.pattern[1:], pattern.flags)
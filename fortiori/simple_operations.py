@@ -1,113 +1,75 @@
 import re
-from typing import List, Iterable
+import sys
+from bisect import bisect_left
+from typing import List, Optional, Dict, Match, Set
 
 from jivago_streams import Stream, Nullable
 
+from fortiori.block_index import BlockIndex
 from fortiori.edits import CodeEdit, apply_edits, remove_unused_whitespace
-from fortiori.exceptions import CannotFindSymbolDeclarationException
-from fortiori.type import VariableDeclaration, FunctionBlock, SymbolDeclaration, CodeBlock
+from fortiori.exceptions import OverlappingCodeEditsException
+from fortiori.lexical import LexicalIndex
+from fortiori.lines import LineIndex
+from fortiori.fused_scanner import ScanHandler, ScanContext, scan
+from fortiori.scanning import matching_parenthesis, find_line_matches
+from fortiori.symbols import SymbolTable
+from fortiori.syntax import parse, SyntaxTree, Token, COMMENT_TOKEN, WORD, WHITESPACE, NEWLINE, SEPARATOR, OPEN_BRACKET, \
+    CLOSE_BRACKET
+from fortiori.tree_operations import encode_case_sensitive_identifiers, replace_curly_brackets
+from fortiori.type import VariableDeclaration, CodeBlock
 
-VALID_BLOCK_NAMES = ("function", "subroutine", "module", "do", "program", "type")
 
-
-def strip_comments(text: str) -> str:
-    lines = text.split("\n")
-    result = []
-    for line in lines:
-        if "!" in line:
-            comment_markers = re.finditer("!", line)
-            first_comment_marker_index = Stream(comment_markers) \
-                .map(lambda matcher: matcher.start()) \
-                .filter(lambda pos: not _is_inside_string_block(pos, line)) \
-                .first()
-            if first_comment_marker_index.isPresent():
-                result.append(line[:first_comment_marker_index.get()])
-            else:
-                result.append(line)
-        else:
-            result.append(line)
-
-    return "\n".join(result)
+def strip_comments(text: str, tree: Optional[SyntaxTree] = None) -> str:
+    if tree is None:
+        tree = parse(text)
+    return apply_edits(text, [CodeEdit(token.position, token.position + len(token.text), "")
+                              for token in tree.tokens if token.kind == COMMENT_TOKEN])
 
 
 def remove_curly_brackets(text: str) -> str:
-    code_block_stack = []
-    brackets = re.finditer(r"\{|\}", text)
-    code_edits: List[CodeEdit] = []
-
-    for bracket_match in brackets:
-        start_pos, end_pos = bracket_match.start(), bracket_match.end()
-        if _is_inside_string_block(start_pos, text):
-            continue
-        if text[start_pos] == '{':
-            code_block_stack.append(_previous_keyword(text, start_pos))
-            code_edits.append(CodeEdit(start_pos, end_pos, "\n"))
-        else:
-            ending_block = code_block_stack.pop()
-            code_edits.append(CodeEdit(start_pos, end_pos, f"\nend {ending_block};\n"))
-
-    return remove_unused_whitespace(apply_edits(text, code_edits))
-
-
-def _previous_keyword(text: str, bracket_position: int) -> str:
-    return Stream(VALID_BLOCK_NAMES) \
-        .filter(lambda block: block in text[:bracket_position]) \
-        .map(lambda block: (block, text.rindex(block, 0, bracket_position))) \
-        .reduce(("", -1), lambda acc, e: acc if acc[1] > e[1] else e)[0]
+    return remove_unused_whitespace(replace_curly_brackets(parse(text)).emit())
 
 
 def remove_line_splits_inside_blocks(text: str) -> str:
+    edits: List[CodeEdit] = []
     depth = 0
-    result = ""
-    for line in text.split("\n"):
-        depth += line.count("(") - line.count(")")
-        if depth > 0:
-            result += line
-        else:
-            result += line + "\n"
-    return result
+    line_end = 0
+    for line_start, line_end in LineIndex(text).spans():
+        depth += text.count("(", line_start, line_end) - text.count(")", line_start, line_end)
+        if depth > 0 and line_end < len(text):
+            edits.append(CodeEdit(line_end, line_end + 1, ""))
+    if depth <= 0:
+        edits.append(CodeEdit(line_end, line_end, "\n"))
+    return apply_edits(text, edits)
 
 
-def _is_inside_string_block(position: int, text: str) -> bool:
-    for quote_symbol in ('"', "'"):
-        quotes = re.finditer(f"\\{quote_symbol}", text[:position])
-        quotes_count = Stream(quotes).count()
-        if quotes_count % 2 == 1:
-            return True
-    return False
+_PARAMETER_DECLARATION = re.compile(r"::( |\n)*[^,\) \n]+")
+_RETURN_STATEMENT = re.compile(r"return\s+(.+);")
+_USE_STATEMENT = re.compile(r"^\s*use .*$", flags=re.M)
+_WORD_AFTER = re.compile(r"\s*(\w+)")
+_FUNCTION_HEADER = re.compile(r"([^\s{};]+)\s+function\s+([^\s(]+)\(")
 
 
 def move_function_parameter_type_declaration_to_body(text: str) -> str:
     edits: List[CodeEdit] = []
+    lexical_index = LexicalIndex(text)
 
-    for function_declaration in re.finditer(r"^\s*\S+( |\n)+(function|subroutine)( |\n)+[^\(]+( |\n)*\(", text,
+    for function_declaration in re.finditer(r"^\s*(\S+( |\n)+)?(function|subroutine)( |\n)+[^\(]+( |\n)*\(", text,
                                             re.MULTILINE):
-        if _is_inside_string_block(function_declaration.start(), text):
+        if lexical_index.is_inside_string(function_declaration.start()):
             continue
 
-        depth = 1
-        declaration_closing_parenthesis = None
-        for parenthesis in re.finditer(r"(\(|\))", text[function_declaration.end():]):
-            if text[function_declaration.end():][parenthesis.start()] == '(':
-                depth += 1
-            else:
-                depth -= 1
-            if depth == 0:
-                declaration_closing_parenthesis = parenthesis.start() + function_declaration.end()
-                break
-
+        declaration_closing_parenthesis = matching_parenthesis(text, function_declaration.end())
         function_opening_curly_bracket = text.index("{", function_declaration.end())
-        parameter_str = text[function_declaration.end():declaration_closing_parenthesis]
 
         parameter_declarations: List[VariableDeclaration] = []
-        parameter = re.search(r"::( |\n)*[^,\) \n]+", parameter_str)
-        while parameter:
-            identifier = parameter_str[parameter.start() + 2:parameter.end()].strip(" \n\t")
-            declared_type = parameter_str[:parameter.start()].strip(", \n\t")
+        previous_parameter_end = function_declaration.end()
+        parameters_end = declaration_closing_parenthesis if declaration_closing_parenthesis is not None else len(text)
+        for parameter in _PARAMETER_DECLARATION.finditer(text, previous_parameter_end, parameters_end):
+            identifier = text[parameter.start() + 2:parameter.end()].strip(" \n\t")
+            declared_type = text[previous_parameter_end:parameter.start()].strip(", \n\t")
             parameter_declarations.append(VariableDeclaration(declared_type, identifier))
-
-            parameter_str = parameter_str[parameter.end():]
-            parameter = re.search(r"::( |\n)*[^,\) \n]+", parameter_str)
+            previous_parameter_end = parameter.end()
 
         edits.append(CodeEdit(function_declaration.start(),
                               declaration_closing_parenthesis + 1,
@@ -121,272 +83,314 @@ def move_function_parameter_type_declaration_to_body(text: str) -> str:
 
 
 BLOCKS_WHICH_DECLARE_VARIABLES = ("function", "subroutine", "program")
-
-
-def move_variable_declaration_to_start_of_block(text: str) -> str:
+INLINED_FUNCTIONS = ("cast",)
+# Fortran intrinsic functions, which need no declaration unless the source defines a function of the same name.
+INTRINSIC_FUNCTIONS = frozenset((
+    "abs", "achar", "acos", "acosh", "adjustl", "adjustr", "aimag", "aint", "all", "allocated", "anint", "any",
+    "asin", "asinh", "associated", "atan", "atan2", "atanh", "bit_size", "btest", "ceiling", "char", "cmplx",
+    "conjg", "cos", "cosh", "count", "cshift", "dble", "digits", "dim", "dot_product", "dprod", "eoshift", "epsilon",
+    "exp", "exponent", "findloc", "floor", "fraction", "huge", "hypot", "iachar", "iand", "ibclr", "ibits", "ibset",
+    "ichar", "ieor", "index", "int", "ior", "ishft", "ishftc", "kind", "lbound", "len", "len_trim", "lge", "lgt",
+    "lle", "llt", "log", "log10", "logical", "matmul", "max", "maxexponent", "maxloc", "maxval", "merge", "min",
+    "minexponent", "minloc", "minval", "mod", "modulo", "nearest", "new_line", "nint", "norm2", "not", "null", "pack",
+    "popcnt", "precision", "present", "product", "radix", "range", "real", "repeat", "reshape", "rrspacing", "scale",
+    "scan", "selected_char_kind", "selected_int_kind", "selected_real_kind", "set_exponent", "shape", "sign", "sin",
+    "sinh", "size", "spacing", "spread", "sqrt", "storage_size", "sum", "tan", "tanh", "tiny", "transfer",
+    "transpose", "trim", "ubound", "unpack", "verify",
+))
+# Tokens after which a name followed by a parenthesis does not invoke a function.
+NOT_INVOKING_PREFIXES = ("call", "new", "function", "subroutine", "%")
+# Keywords which take a parenthesis, e.g. if(...) or write(...).
+STATEMENT_KEYWORDS = ("if", "while", "case", "select", "where", "forall", "print", "write", "read", "open", "close",
+                      "inquire", "allocate", "deallocate", "nullify", "dimension", "intent", "type", "class")
+
+
+def move_variable_declaration_to_start_of_block(text: str, tree: Optional[SyntaxTree] = None) -> str:
+    """Edits each statement in place, so that the statements which stay keep their original lines."""
     edits: List[CodeEdit] = []
+    block_index = BlockIndex(tree if tree is not None else parse(text))
+    line_index = LineIndex(text)
     for block_name in BLOCKS_WHICH_DECLARE_VARIABLES:
-        for declaration in re.finditer(r"^.*" + block_name + r".*(\(.*\))?.*$", text, flags=re.M):
-            block_start = text.index("{", declaration.start()) + 1
-            block_end = -1
-            depth = 0
-            for bracket in re.finditer(r"(\{|\})", text[declaration.start():]):
-                if text[declaration.start():][bracket.start()] == "{":
-                    depth += 1
-                else:
-                    depth -= 1
+        for block in block_index.blocks_of_type(block_name):
+            block_start, block_end = block.block_start, block.block_end
 
-                if depth == 0:
-                    block_end = declaration.start() + bracket.start()
-                    break
-
-            code_block_str = text[block_start:block_end]
             variable_declaration_statements = []
-            other_statements = []
             use_statements = []
+            kept_statements = 0
+            last_statement_kept = True
 
-            for statement in code_block_str.split("\n"):
-                inline_assignation_operator = re.search(r"((.|\s)+::([^=]|\s)*)(=?)", statement)
+            for statement_start, statement_end in line_index.spans(block_start, block_end):
+                statement = text[statement_start:statement_end]
+                inline_assignation_operator = re.search(r"([\s\S]+::[^=]*)(=?)", statement)
+                replacement = statement
                 if inline_assignation_operator:
-                    if "=" not in inline_assignation_operator.group(4):
+                    if "=" not in inline_assignation_operator.group(2):
                         variable_declaration_statements.append(
                             inline_assignation_operator.group(1).strip(" \n\t;") + ";\n")
+                        replacement = None
                     elif inline_assignation_operator.group(1).strip(" \n\t").startswith("do"):
                         variable_declaration_statements.append(
                             inline_assignation_operator.group(1).strip(" \n\t")[2:] + ";\n")
-                        assignation_substatement = "do " + statement[statement.index("::") + 2:]
-                        other_statements.append(assignation_substatement)
+                        replacement = "do " + statement[statement.index("::") + 2:]
                     else:
                         variable_declaration_statements.append(
                             inline_assignation_operator.group(1).strip(" \n\t") + ";\n")
-                        assignation_substatement = statement[statement.index("::") + 2:]
-                        other_statements.append(assignation_substatement)
+                        replacement = statement[statement.index("::") + 2:]
+                elif re.findall(r"^\s*use .*$", statement):
+                    use_statements.append(statement)
+                    replacement = None
+
+                last_statement_kept = replacement is not None
+                if replacement is None:
+                    edits.append(CodeEdit(statement_start, min(statement_end + 1, block_end), ""))
                 else:
-                    if re.findall(r"^\s*use .*$", statement):
-                        use_statements.append(statement)
-                    else:
-                        other_statements.append(statement)
-
-            edits.append(CodeEdit(block_start,
-                                  block_end,
-                                  "\n" + "\n".join(use_statements) + "\n" + "\n".join(variable_declaration_statements) +
-                                  "\n".join(other_statements) + "\n"))
+                    kept_statements += 1
+                    if replacement != statement:
+                        edits.append(CodeEdit(statement_start, statement_end, replacement))
+
+            edits.append(CodeEdit(block_start, block_start, "\n" + "\n".join(use_statements) + "\n" +
+                                  "\n".join(variable_declaration_statements)))
+            if last_statement_kept or kept_statements == 0:
+                edits.append(CodeEdit(block_end, block_end, "\n"))
     return apply_edits(text, edits)
 
 
-def _find_function_blocks(text: str, block_name: str = "function") -> Iterable[FunctionBlock]:
-    for declaration in re.finditer(r"^.*" + block_name + r"([^\(]+)(\(.*\))?.*$", text, flags=re.M):
-        if _is_inside_string_block(declaration.start(), text):
-            continue
-        block_start = text.index("{", declaration.start()) + 1
-        block_end = -1
-        depth = 0
-        function_name = declaration.group(1)
-        for bracket in re.finditer(r"(\{|\})", text[declaration.start():]):
-            if text[bracket.start() + declaration.start()] == "{":
-                depth += 1
-            else:
-                depth -= 1
-
-            if depth == 0:
-                block_end = declaration.start() + bracket.start()
-                break
-
-        yield FunctionBlock(function_name, block_start, block_end, text[block_start:block_end])
-
-
-def translate_return_statement(text: str) -> str:
+def translate_return_statement(text: str, tree: Optional[SyntaxTree] = None) -> str:
     edits: List[CodeEdit] = []
-    for function_block in _find_function_blocks(text):
-        content = text[function_block.block_start:function_block.block_end]
-        if "return" not in content:
+    lexical_index = LexicalIndex(text)
+    for function_block in BlockIndex(tree if tree is not None else parse(text)).blocks_of_type("function"):
+        if text.find("return", function_block.block_start, function_block.block_end) == -1:
             continue
 
-        for return_statement in re.finditer(r"return\s+(.+);", content):
-            if _is_inside_string_block(return_statement.start(), text):
+        for return_statement in _RETURN_STATEMENT.finditer(text, function_block.block_start, function_block.block_end):
+            if lexical_index.is_inside_string(return_statement.start()):
                 continue
             returned_value = return_statement.group(1)
-            edits.append(CodeEdit(function_block.block_start + return_statement.start(),
-                                  function_block.block_start + return_statement.end(),
-                                  f"{function_block.function_name} = {returned_value};\n"
+            edits.append(CodeEdit(return_statement.start(),
+                                  return_statement.end(),
+                                  f"{function_block.name()} = {returned_value};\n"
                                   "return;"))
 
     return apply_edits(text, edits)
 
 
-def declare_invoked_function_return_types(text: str) -> str:
+def declare_invoked_function_return_types(text: str, signatures: Optional[Dict[str, Optional[str]]] = None,
+                                          tree: Optional[SyntaxTree] = None) -> str:
+    """Declares the return type of each function invoked in a block, once per block. Functions declared by the
+    block itself, including its own result, are skipped. Each invoked name which is neither defined nor an
+    intrinsic is reported once.
+    signatures : Return type of each function, as returned by function_signatures. Computed from the text
+    when missing."""
+    if tree is None:
+        tree = parse(text)
+    if signatures is None:
+        signatures = function_signatures(text, tree)
+
     edits: List[CodeEdit] = []
+    symbol_table = SymbolTable(tree, signatures)
+    reported: Set[str] = set()
+    function_calls = _function_calls(tree.tokens)
+    call_positions = [function_call.position for function_call in function_calls]
     for block_name in BLOCKS_WHICH_DECLARE_VARIABLES:
-        for block in _find_function_blocks(text, block_name=block_name):
+        for block in symbol_table.block_index.blocks_of_type(block_name):
+            declared = set(symbol_table.declarations_in(block)) | {block.name()}
             declaration_statements = []
-            content = text[block.block_start:block.block_end]
-            for function_call in re.finditer(r"(new\s)?([^ \n\t]+)\(.*\)", content):
-                if function_call.group(1):
-                    continue  # new was found
-                try:
-                    invoked_function_name = function_call.group(2)
-                    invoked_function_declaration = re.search(
-                        r"([^ \n\t]+)\s+function\s+" + invoked_function_name + r"\(.*\)", text)
-                    if not invoked_function_declaration:
-                        print(f"Warning: Function {invoked_function_name} is never declared.")
-                        continue
-                except:
+            for function_call in function_calls[bisect_left(call_positions, block.block_start):
+                                                bisect_left(call_positions, block.block_end)]:
+                invoked_function_name = function_call.text
+                if invoked_function_name in declared or invoked_function_name in INLINED_FUNCTIONS:
+                    continue
+                if symbol_table.is_declared(invoked_function_name, function_call.position):
+                    continue  # array declared in an enclosing block
+                if not symbol_table.is_function(invoked_function_name):
+                    if invoked_function_name not in INTRINSIC_FUNCTIONS and invoked_function_name not in reported:
+                        reported.add(invoked_function_name)
+                        print(f"Warning: Function {invoked_function_name} is never declared.", file=sys.stderr)
                     continue
+                function_declared_type = symbol_table.return_type(invoked_function_name)
+                if function_declared_type is None:
+                    continue  # module procedure, declared by use
 
-                function_declared_type = invoked_function_declaration.group(1)
+                declared.add(invoked_function_name)
                 declaration_statements.append(f"{function_declared_type}::{invoked_function_name};")
 
-            edits.append(
-                CodeEdit(block.block_start, block.block_start, "\n" + "\n".join(declaration_statements) + "\n"))
+            insert_pos = _find_pos_after_last_use_statement(text, block)
+            edits.append(CodeEdit(insert_pos, insert_pos, "\n" + "\n".join(declaration_statements) + "\n"))
 
     return apply_edits(text, edits)
 
 
-def add_implicit_none(text: str) -> str:
-    edits: List[CodeEdit] = []
-    for block_name in BLOCKS_WHICH_DECLARE_VARIABLES:
-        for block in _find_function_blocks(text, block_name):
-            insert_pos = _find_pos_after_last_use_statement(block)
-            edits.append(CodeEdit(insert_pos, insert_pos, "\nimplicit none;\n"))
-
-    return apply_edits(text, edits)
+def _function_calls(tokens: List[Token]) -> List[Token]:
+    """Words directly followed by a parenthesis which may invoke a function, statement by statement, in order."""
+    function_calls: List[Token] = []
+    statement: List[Token] = []
+    for token in tokens:
+        if token.kind in (SEPARATOR, NEWLINE, OPEN_BRACKET, CLOSE_BRACKET):
+            function_calls.extend(_statement_function_calls(statement))
+            statement = []
+        elif token.kind not in (WHITESPACE, COMMENT_TOKEN):
+            statement.append(token)
+    function_calls.extend(_statement_function_calls(statement))
+    return function_calls
+
+
+def _statement_function_calls(statement: List[Token]) -> List[Token]:
+    """Words of the type and attributes of a declaration, before its '::', are skipped."""
+    first = 0
+    for i in range(len(statement) - 1):
+        if statement[i].text == statement[i + 1].text == ":":
+            first = i + 2
+            break
+    function_calls = []
+    for i in range(first, len(statement) - 1):
+        word, parenthesis = statement[i], statement[i + 1]
+        if word.kind != WORD or parenthesis.text != "(" or parenthesis.position != word.position + len(word.text):
+            continue
+        if word.text in STATEMENT_KEYWORDS or word.text[0].isdigit():
+            continue
+        if i > 0 and statement[i - 1].text in NOT_INVOKING_PREFIXES:
+            continue  # subroutine call, constructor, type-bound procedure or definition
+        function_calls.append(word)
+    return function_calls
+
+
+def function_signatures(text: str, tree: Optional[SyntaxTree] = None) -> Dict[str, Optional[str]]:
+    """Maps function names to their declared return type. The first declaration of a name wins.
+    Functions defined inside a module map to None, since `use` already declares them wherever they are invoked.
+    Headers may span several lines and share a line with other code, so that the signatures of the source match
+    those of the text once its headers are normalised."""
+    signatures: Dict[str, Optional[str]] = {}
+    block_index = None
+    if "module" in text:
+        block_index = BlockIndex(tree if tree is not None else parse(text))
+    for declaration in _FUNCTION_HEADER.finditer(text):
+        if matching_parenthesis(text, declaration.end()) is None:
+            continue
+        in_module = block_index is not None and _is_inside_module(block_index, declaration.end())
+        signatures.setdefault(declaration.group(2), None if in_module else declaration.group(1))
+    return signatures
 
 
-def _find_pos_after_last_use_statement(block: CodeBlock) -> int:
-    use_statements = [x for x in re.finditer(r"^\s*use .*$", block.block_content, re.MULTILINE)]
-    if use_statements:
-        return use_statements[-1].end() + block.block_start
-    return block.block_start
+def _is_inside_module(block_index: BlockIndex, position: int) -> bool:
+    block = block_index.enclosing_block(position)
+    while block is not None and block.block_type != "module":
+        block = block.parent
+    return block is not None
 
 
-def add_name_to_unnamed_program_blocks(text: str) -> str:
+def add_implicit_none(text: str, tree: Optional[SyntaxTree] = None) -> str:
     edits: List[CodeEdit] = []
-    for program_declaration in re.finditer(r"[^\w\d\n]*program\s*\{", text):
-        if _is_inside_string_block(program_declaration.start(), text):
-            continue
-        edits.append(CodeEdit(program_declaration.start(), program_declaration.end(), "\nprogram main {\n"))
+    block_index = BlockIndex(tree if tree is not None else parse(text))
+    for block_name in BLOCKS_WHICH_DECLARE_VARIABLES:
+        for block in block_index.blocks_of_type(block_name):
+            insert_pos = _find_pos_after_last_use_statement(text, block)
+            edits.append(CodeEdit(insert_pos, insert_pos, "\nimplicit none;\n"))
 
     return apply_edits(text, edits)
 
 
-def translate_case_sensitive_identifier(text: str) -> str:
-    edits: List[CodeEdit] = []
-    for word in re.finditer("\w+", text):
-        if _is_inside_string_block(word.start(), text):
-            continue
-        if word.group(0).lower() != word.group(0):
-            edits.append(CodeEdit(word.start(), word.end(), _encode_character_case(word.group(0))))
-
-    return apply_edits(text, edits)
-
+def _find_pos_after_last_use_statement(text: str, block: CodeBlock) -> int:
+    last_use_statement = None
+    for last_use_statement in find_line_matches(_USE_STATEMENT, text, block.block_start, block.block_end):
+        pass
+    return last_use_statement.end() if last_use_statement else block.block_start
 
-def _encode_character_case(word: str) -> str:
-    character_wise_encoding = Stream(word) \
-        .map(lambda x: [x] if not x.isupper() else [x.lower(), "$"]) \
-        .flat() \
-        .reduce("", lambda a, e: a + e)
 
-    caps_lock_state, caps_lock_encoding = Stream(word) \
-        .reduce((False, ""), lambda state, el:
-    (state[0], state[1] + el.lower())
-    if (state[0] is False and el.islower()) or (state[0] is True and el.isupper())
-    else (not state[0], f"{state[1]}{el.lower()}$$"))
+def add_name_to_unnamed_program_blocks(text: str) -> str:
+    return scan(text, (_UNNAMED_PROGRAM_BLOCK,))
 
-    if caps_lock_state is True:
-        caps_lock_encoding += "$$"
 
-    return character_wise_encoding \
-        if len(character_wise_encoding) <= len(caps_lock_encoding) \
-        else caps_lock_encoding
+def _name_program_block(program_declaration: Match, context: ScanContext) -> List[CodeEdit]:
+    if context.lexical_index.is_inside_string(program_declaration.start()):
+        return []
+    return [CodeEdit(program_declaration.start(), program_declaration.end(), "\nprogram main {\n")]
 
 
-def _next_word(text: str, start_position: int) -> str:
-    return Stream(re.finditer(r"\s*(\w+)", text[start_position:])) \
-        .firstMatch(lambda match: not _is_inside_string_block(match.start(), text)) \
-        .map(lambda match: match.group(1)) \
-        .orElse("")
+def translate_case_sensitive_identifier(text: str) -> str:
+    return encode_case_sensitive_identifiers(parse(text)).emit()
 
 
-def _previous_word(text: str, search_end_position: int) -> str:
-    return Stream(reversed(list(re.finditer(r"(w+)\s*", text[:search_end_position])))) \
-        .firstMatch(lambda match: not _is_inside_string_block(match.start(), text)) \
+def _next_word(text: str, start_position: int, lexical_index: LexicalIndex) -> str:
+    return Stream(_WORD_AFTER.finditer(text, start_position)) \
+        .firstMatch(lambda match: not lexical_index.is_inside_string(match.start())) \
         .map(lambda match: match.group(1)) \
         .orElse("")
 
 
-def _block_end(text: str, inside_first_bracket_position: int) -> int:
-    block_end = -1
-    depth = 1
-    for bracket in re.finditer(r"(\{|\})", text[inside_first_bracket_position:]):
-        if bracket.group(0) == "{":
-            depth += 1
-        else:
-            depth -= 1
-        if depth == 0:
-            block_end = bracket.start() + inside_first_bracket_position
-            break
-    return block_end
-
-
 def convert_conditional_blocks(text: str) -> str:
-    edits: List[CodeEdit] = []
+    return scan(text, (_IF_BLOCK, _ELSE_BLOCK))
 
-    for if_declaration in re.finditer(r"if\s*(\(.*\))\s*\{", text):
-        if_condition = if_declaration.group(1)
 
-        block_end = _block_end(text, if_declaration.end())
+def _convert_if_block(if_declaration: Match, context: ScanContext) -> List[CodeEdit]:
+    block = context.block_index.block_opened_at(if_declaration.end() - 1)
+    if block is None:
+        return []
+    block_end = block.block_end
+    next_word = _next_word(context.text, block_end, context.lexical_index)
 
-        next_word = _next_word(text, block_end)
+    return [CodeEdit(if_declaration.start(), if_declaration.end(), f"if {if_declaration.group(1)} then\n"),
+            CodeEdit(block_end, block_end + 1, "" if next_word == "else" else "end if;")]
 
-        edits.append(CodeEdit(if_declaration.start(), if_declaration.end(), f"if {if_condition} then\n"))
-        edits.append(CodeEdit(block_end, block_end + 1, ""))
 
-        if next_word != "else":
-            edits.append(CodeEdit(block_end, block_end + 1, "end if;"))
+def _convert_else_block(else_declaration: Match, context: ScanContext) -> List[CodeEdit]:
+    block = context.block_index.block_opened_at(else_declaration.end() - 1)
+    if block is None:
+        return []
+    block_end = block.block_end
 
-    for else_declaration in re.finditer(r"else\s*\{", text):
-        block_start = else_declaration.end()
-        block_end = _block_end(text, block_start)
-
-        edits.append(CodeEdit(else_declaration.start(), else_declaration.end(), "else\n"))
-        edits.append(CodeEdit(block_end, block_end + 1, "end if;\n"))
-
-    return apply_edits(text, edits)
+    return [CodeEdit(else_declaration.start(), else_declaration.end(), "else\n"),
+            CodeEdit(block_end, block_end + 1, "end if;\n")]
 
 
 def replace_object_reference_type_declaration(text: str) -> str:
-    edits: List[CodeEdit] = []
-    for declaration in re.finditer(r"(\w+),\s*object\s*::\s*(.+)$", text, flags=re.M):
-        if _is_inside_string_block(declaration.start(), text):
-            continue
+    return scan(text, (_OBJECT_REFERENCE_DECLARATION,))
 
-        edits.append(CodeEdit(declaration.start(),
-                              declaration.end(),
-                              f"type({declaration.group(1)}),pointer::{declaration.group(2).strip(',')}"))
 
-    return apply_edits(text, edits)
+def _replace_object_reference(declaration: Match, context: ScanContext) -> List[CodeEdit]:
+    if context.lexical_index.is_inside_string(declaration.start()):
+        return []
+    return [CodeEdit(declaration.start(), declaration.end(),
+                     f"type({declaration.group(1)}),pointer::{declaration.group(2).strip(',')}")]
 
 
-def _find_symbol_declaration(symbol_name: str, text: str, usage_position: int) -> SymbolDeclaration:
-    return Stream(reversed(list(
-        re.finditer(r"[^:\n;]*::\s*(\w+,)*" + symbol_name + r".*$", text[:usage_position], flags=re.M)))) \
-        .firstMatch(lambda x: not _is_inside_string_block(x.start(), text)) \
-        .map(lambda x: SymbolDeclaration(symbol_name, text[x.start(): x.end()])) \
-        .orElseThrow(CannotFindSymbolDeclarationException(symbol_name))
+def inline_pointer_cast_function(text: str) -> str:
+    return scan(text, (_POINTER_CAST,))
 
 
-def inline_pointer_cast_function(text: str) -> str:
-    edits: List[CodeEdit] = []
-    for cast_call in re.finditer(r"(\w+)\s*=\s*cast\((\w+)\)", text):
-        if _is_inside_string_block(cast_call.start(), text):
-            continue
-        destination_variable = cast_call.group(1)
-        source_pointer = cast_call.group(2)
+def _inline_pointer_cast(cast_call: Match, context: ScanContext) -> List[CodeEdit]:
+    if context.lexical_index.is_inside_string(cast_call.start()):
+        return []
+    destination_variable = cast_call.group(1)
+    source_pointer = cast_call.group(2)
 
-        target_symbol_declaration = _find_symbol_declaration(destination_variable, text, cast_call.start())
-        if target_symbol_declaration.is_gc_object():
-            edits.append(CodeEdit(cast_call.start(), cast_call.end(), f"""select type(a => {source_pointer})
+    target_symbol_declaration = context.symbol_table.declaration(destination_variable, cast_call.start())
+    if not target_symbol_declaration.is_gc_object():
+        return []
+    return [CodeEdit(cast_call.start(), cast_call.end(), f"""select type(a => {source_pointer})
             class is ({target_symbol_declaration.get_object_declared_type()})
             {destination_variable} => a
-            end select"""))
-    return apply_edits(text, edits)
+            end select""")]
+
+
+_UNNAMED_PROGRAM_BLOCK = ScanHandler("add_name_to_unnamed_program_blocks", r"[^\w\d\n]*program\s*\{",
+                                     _name_program_block, ("program",))
+_IF_BLOCK = ScanHandler("convert_conditional_blocks", r"if\s*(\(.*\))\s*\{", _convert_if_block, ("if",))
+_ELSE_BLOCK = ScanHandler("convert_conditional_blocks", r"else\s*\{", _convert_else_block, ("else",))
+_POINTER_CAST = ScanHandler("inline_pointer_cast_function", r"(\w+)\s*=\s*cast\((\w+)\)", _inline_pointer_cast,
+                            ("cast(",))
+_OBJECT_REFERENCE_DECLARATION = ScanHandler("replace_object_reference_type_declaration",
+                                            r"(\w+),\s*object\s*::\s*(.+)$", _replace_object_reference, ("object",))
+FUSED_HANDLERS = (_UNNAMED_PROGRAM_BLOCK, _IF_BLOCK, _ELSE_BLOCK, _POINTER_CAST, _OBJECT_REFERENCE_DECLARATION)
+
+
+def rewrite_block_headers_and_pointers(text: str, tree: Optional[SyntaxTree] = None) -> str:
+    """add_name_to_unnamed_program_blocks, convert_conditional_blocks, inline_pointer_cast_function and
+    replace_object_reference_type_declaration in a single scan, once declarations have been moved to the start of
+    their blocks. Falls back to running them one after the other when their edits overlap."""
+    try:
+        return scan(text, FUSED_HANDLERS, tree)
+    except OverlappingCodeEditsException:
+        for operation in (add_name_to_unnamed_program_blocks, convert_conditional_blocks,
+                          inline_pointer_cast_function, replace_object_reference_type_declaration):
+            text = operation(text)
+        return text
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+from typing import TextIO, Optional, Dict
+
+from fortiori.build import output_path
+from fortiori.incremental import iter_units, with_lines_before, located_in_file
+from fortiori.profiling import PipelineProfiler
+from fortiori.simple_operations import function_signatures, strip_comments
+from fortiori.transpiler import Transpiler
+
+STDIO = "-"
+# Appended to the name of an output file while it is being written.
+PARTIAL_OUTPUT_SUFFIX = ".partial"
+
+
+def transpile_stream(source: TextIO, sink: TextIO, transpiler: Transpiler,
+                     profiler: Optional[PipelineProfiler] = None):
+    """Transpiles one program unit at a time, writing it out before the next unit is read, so memory is bounded
+    by the largest unit rather than the whole input. The output is identical to the IncrementalTranspiler's.
+    Cross-unit pipelines need every signature before the first unit: the source is then read twice. Sources which
+    cannot seek, such as pipes, are spooled to a temporary file during the first read."""
+    if not transpiler.is_cross_unit():
+        _transpile_units(source, sink, transpiler, None, profiler)
+    elif source.seekable():
+        signatures = _signatures(source, None)
+        source.seek(0)
+        _transpile_units(source, sink, transpiler, signatures, profiler)
+    else:
+        with tempfile.TemporaryFile('w+') as spool:
+            signatures = _signatures(source, spool)
+            spool.seek(0)
+            _transpile_units(spool, sink, transpiler, signatures, profiler)
+
+
+class _UnitWriter(object):
+
+    def __init__(self, sink: TextIO):
+        """Writes the outputs of consecutive units to the sink as join_outputs joins them: a newline goes before
+        the first text of each unit but the first, and units writing nothing add nothing."""
+        self.sink = sink
+        self._written = False
+        self._unit_started = False
+
+    def write(self, text: str):
+        if not text:
+            return
+        if not self._unit_started:
+            if self._written:
+                self.sink.write("\n")
+            self._unit_started = True
+        self.sink.write(text)
+        self._written = True
+
+    def next_unit(self):
+        self._unit_started = False
+
+
+def _transpile_units(source: TextIO, sink: TextIO, transpiler: Transpiler,
+                     signatures: Optional[Dict[str, Optional[str]]], profiler: Optional[PipelineProfiler]):
+    writer = _UnitWriter(sink)
+    for unit, lines_before in with_lines_before(iter_units(source)):
+        with located_in_file(lines_before):
+            transpiler.transpile_to(unit, writer, signatures, profiler)
+        writer.next_unit()
+        sink.flush()
+
+
+def _signatures(source: TextIO, spool: Optional[TextIO]) -> Dict[str, Optional[str]]:
+    signatures: Dict[str, Optional[str]] = {}
+    for unit in iter_units(source):
+        if spool is not None:
+            spool.write(unit)
+        for name, return_type in function_signatures(strip_comments(unit)).items():
+            signatures.setdefault(name, return_type)
+    return signatures
+
+
+def stream_file(source_path: str, output_dir: str, transpiler: Transpiler,
+                profiler: Optional[PipelineProfiler] = None):
+    """source_path : File to transpile into the output directory, or '-' to read stdin and write stdout.
+    The output file is written under a temporary name and only replaces the previous output once every unit is
+    transpiled, so that a failing unit leaves no truncated output."""
+    if profiler is not None:
+        profiler.current_file = source_path
+    if source_path == STDIO:
+        transpile_stream(sys.stdin, sys.stdout, transpiler, profiler)
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = output_path(source_path, output_dir)
+    partial_path = path + PARTIAL_OUTPUT_SUFFIX
+    try:
+        with open(source_path, 'r') as source, open(partial_path, 'w') as sink:
+            transpile_stream(source, sink, transpiler, profiler)
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
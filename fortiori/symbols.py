@@ -0,0 +1,64 @@
+import re
+from typing import Dict, List, Optional, Union
+
+from fortiori.block_index import BlockIndex
+from fortiori.exceptions import CannotFindSymbolDeclarationException
+from fortiori.syntax import SyntaxTree, Statement, Block, STRING, COMMENT_TOKEN, SEPARATOR, NEWLINE
+from fortiori.type import SymbolDeclaration
+
+
+class SymbolTable(object):
+
+    def __init__(self, tree: SyntaxTree, signatures: Dict[str, Optional[str]]):
+        """Variables declared in each block, and function return types, collected once per text.
+        signatures : Return type of each function, as returned by function_signatures."""
+        self.block_index = BlockIndex(tree)
+        self.signatures = signatures
+        self._global_scope = _declarations(tree.units)
+        self._scopes: Dict[int, Dict[str, SymbolDeclaration]] = {
+            block.opening_bracket.position: _declarations(block.children) for block in self.block_index.blocks}
+
+    def declarations_in(self, block: Block) -> Dict[str, SymbolDeclaration]:
+        """Variables declared by the block's own statements, excluding nested blocks."""
+        return self._scopes[block.opening_bracket.position]
+
+    def declaration(self, symbol_name: str, usage_position: int) -> SymbolDeclaration:
+        """Innermost declaration visible from the position, searching the enclosing blocks outwards."""
+        block = self.block_index.enclosing_block(usage_position)
+        while block is not None:
+            declaration = self.declarations_in(block).get(symbol_name)
+            if declaration is not None:
+                return declaration
+            block = block.parent
+        if symbol_name in self._global_scope:
+            return self._global_scope[symbol_name]
+        raise CannotFindSymbolDeclarationException(symbol_name, position=usage_position)
+
+    def is_declared(self, symbol_name: str, usage_position: int) -> bool:
+        try:
+            self.declaration(symbol_name, usage_position)
+            return True
+        except CannotFindSymbolDeclarationException:
+            return False
+
+    def is_function(self, name: str) -> bool:
+        return name in self.signatures
+
+    def return_type(self, function_name: str) -> Optional[str]:
+        """None for module procedures and unknown functions."""
+        return self.signatures.get(function_name)
+
+
+def _declarations(children: List[Union[Statement, Block]]) -> Dict[str, SymbolDeclaration]:
+    declarations: Dict[str, SymbolDeclaration] = {}
+    for child in children:
+        if not isinstance(child, Statement):
+            continue
+        code = "".join([token.text for token in child.tokens if token.kind not in (STRING, COMMENT_TOKEN)])
+        if "::" not in code:
+            continue
+        line = "".join([token.text for token in child.tokens if token.kind not in (SEPARATOR, NEWLINE)])
+        declared_names = code.split("::", 1)[1].split("=", 1)[0]
+        for name in re.findall(r"(?:^|,)\s*(\w+)", declared_names):
+            declarations[name] = SymbolDeclaration(name, line)
+    return declarations
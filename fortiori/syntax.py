@@ -0,0 +1,199 @@
+import re
+from bisect import bisect_left
+from typing import List, Union, Iterator, Optional
+
+from fortiori.edits import CodeEdit
+from fortiori.exceptions import UnbalancedBracketException
+from fortiori.lexical import STRING_LITERAL, COMMENT
+from fortiori.type import CodeBlock
+
+VALID_BLOCK_NAMES = ("function", "subroutine", "module", "do", "program", "type")
+CONDITIONAL_BLOCK_NAMES = ("if", "else")
+
+STRING = "string"
+COMMENT_TOKEN = "comment"
+WORD = "word"
+NEWLINE = "newline"
+WHITESPACE = "whitespace"
+OPEN_BRACKET = "open_bracket"
+CLOSE_BRACKET = "close_bracket"
+SEPARATOR = "separator"
+SYMBOL = "symbol"
+
+_TOKEN = re.compile(f"(?P<{STRING}>{STRING_LITERAL})"
+                    f"|(?P<{COMMENT_TOKEN}>{COMMENT})"
+                    f"|(?P<{WORD}>[\\w$]+)"
+                    f"|(?P<{NEWLINE}>\\n)"
+                    f"|(?P<{WHITESPACE}>[^\\S\\n]+)"
+                    f"|(?P<{OPEN_BRACKET}>\\{{)"
+                    f"|(?P<{CLOSE_BRACKET}>\\}})"
+                    f"|(?P<{SEPARATOR}>;)"
+                    f"|(?P<{SYMBOL}>.)", flags=re.M)
+
+
+class Token(object):
+    __slots__ = ("kind", "text", "position")
+
+    def __init__(self, kind: str, text: str, position: int):
+        """position : Offset of the token in the parsed source. Rewrites only change the text."""
+        self.kind = kind
+        self.text = text
+        self.position = position
+
+
+class Statement(object):
+    __slots__ = ("tokens",)
+
+    def __init__(self, tokens: List[Token]):
+        """Tokens up to and including the terminating ';' or newline."""
+        self.tokens = tokens
+
+
+class Block(CodeBlock):
+    __slots__ = ("header", "opening_bracket", "closing_bracket", "children", "parent")
+
+    def __init__(self, block_type: str, header: Statement, opening_bracket: Token, closing_bracket: Token,
+                 children: List[Union[Statement, "Block"]], source: str):
+        """header : Tokens between the previous statement and the opening bracket."""
+        super().__init__(block_type, opening_bracket.position + 1, closing_bracket.position, source)
+        self.header = header
+        self.opening_bracket = opening_bracket
+        self.closing_bracket = closing_bracket
+        self.children = children
+        self.parent: Optional[Block] = None
+        for child in children:
+            if isinstance(child, Block):
+                child.parent = self
+
+    def blocks(self) -> Iterator["Block"]:
+        """Depth-first iteration over this block and every nested block."""
+        yield self
+        for child in self.children:
+            if isinstance(child, Block):
+                yield from child.blocks()
+
+    def name(self) -> str:
+        """Word following the block keyword in the header, e.g. the function name. Empty for unnamed blocks."""
+        words = [token.text for token in self.header.tokens if token.kind == WORD]
+        return words[words.index(self.block_type) + 1] if self.block_type in words[:-1] else ""
+
+
+class SyntaxTree(object):
+
+    def __init__(self, tokens: List[Token], units: List[Union[Statement, Block]]):
+        """tokens : Every token of the source, in order. Emitting them back yields the source text.
+        units : Top-level statements and program units."""
+        self.tokens = tokens
+        self.units = units
+
+    def blocks(self) -> Iterator[Block]:
+        for unit in self.units:
+            if isinstance(unit, Block):
+                yield from unit.blocks()
+
+    def emit(self) -> str:
+        return "".join([token.text for token in self.tokens])
+
+
+def tokenize(text: str, start: int = 0, end: Optional[int] = None) -> List[Token]:
+    """end : Exclusive, at a line end or at the end of the text. No token spans a line, so the lines of a text can be
+    tokenized separately."""
+    matches = _TOKEN.finditer(text, start, len(text) if end is None else end)
+    return [Token(match.lastgroup, match.group(), match.start()) for match in matches]
+
+
+def parse(text: str) -> SyntaxTree:
+    return _build_tree(tokenize(text), text)
+
+
+def reparse(tree: SyntaxTree, text: str, edits: List[CodeEdit], edited_text: str) -> SyntaxTree:
+    """Tree of apply_edits(text, edits), from the tree of the text. Only the lines touched by an edit are tokenized
+    again. The tokens of the other lines are moved in place: the given tree must not be used afterwards."""
+    tokens = tree.tokens
+    token_positions = [token.position for token in tokens]
+    edited_tokens: List[Token] = []
+    copied, shift = 0, 0
+    for start, end, length_change in _edited_lines(text, edits):
+        first, last = bisect_left(token_positions, start, copied), bisect_left(token_positions, end, copied)
+        edited_tokens.extend(_moved(tokens[copied:first], shift))
+        edited_tokens.extend(tokenize(edited_text, start + shift, end + shift + length_change))
+        copied, shift = last, shift + length_change
+    edited_tokens.extend(_moved(tokens[copied:], shift))
+    return _build_tree(edited_tokens, edited_text)
+
+
+def _edited_lines(text: str, edits: List[CodeEdit]) -> List[List[int]]:
+    """[start, end, length change] of each run of lines touched by the edits, end excluding the final newline."""
+    lines: List[List[int]] = []
+    for edit in sorted(edits, key=lambda edit: (edit.start_pos, edit.end_pos)):
+        start = text.rfind("\n", 0, edit.start_pos) + 1
+        end = text.find("\n", edit.end_pos)
+        end = len(text) if end == -1 else end
+        length_change = len(edit.inserted_text) - (edit.end_pos - edit.start_pos)
+        if lines and start <= lines[-1][1]:
+            lines[-1][1] = max(lines[-1][1], end)
+            lines[-1][2] += length_change
+        else:
+            lines.append([start, end, length_change])
+    return lines
+
+
+def _moved(tokens: List[Token], shift: int) -> List[Token]:
+    if shift:
+        for token in tokens:
+            token.position += shift
+    return tokens
+
+
+def _build_tree(tokens: List[Token], text: str) -> SyntaxTree:
+    """Builds the tree in a single pass over the tokens. A header written on the line before its opening bracket
+    belongs to the block. A block's type is the first keyword of its header, or the last block keyword seen
+    before its opening bracket."""
+    units: List[Union[Statement, Block]] = []
+    children = units
+    open_blocks = []
+    statement: List[Token] = []
+    last_keyword = ""
+
+    for token in tokens:
+        if token.kind == OPEN_BRACKET:
+            if _is_blank(statement) and children and isinstance(children[-1], Statement) \
+                    and children[-1].tokens[-1].kind == NEWLINE:
+                statement = children.pop().tokens + statement
+            open_blocks.append((children, _block_type(statement, last_keyword), Statement(statement), token))
+            children, statement = [], []
+        elif token.kind == CLOSE_BRACKET:
+            if not open_blocks:
+                raise UnbalancedBracketException("unmatched '}'", position=token.position)
+            if statement:
+                children.append(Statement(statement))
+            parent_children, block_type, header, opening_bracket = open_blocks.pop()
+            parent_children.append(Block(block_type, header, opening_bracket, token, children, text))
+            children, statement = parent_children, []
+        else:
+            statement.append(token)
+            if token.kind == WORD and token.text in VALID_BLOCK_NAMES:
+                last_keyword = token.text
+            if token.kind in (SEPARATOR, NEWLINE):
+                children.append(Statement(statement))
+                statement = []
+
+    if open_blocks:
+        raise UnbalancedBracketException("unclosed '{'", position=open_blocks[-1][3].position)
+    if statement:
+        children.append(Statement(statement))
+    return SyntaxTree(tokens, units)
+
+
+def _is_blank(tokens: List[Token]) -> bool:
+    return all(token.kind in (WHITESPACE, NEWLINE) for token in tokens)
+
+
+def _block_type(header: List[Token], last_keyword: str) -> str:
+    words = [token.text for token in header if token.kind == WORD]
+    if words and words[0] in CONDITIONAL_BLOCK_NAMES:
+        return words[0]
+    for word in words:
+        if word in VALID_BLOCK_NAMES:
+            return word
+    return last_keyword
@@ -1,4 +1,150 @@
+import io
+from typing import List, Optional, Dict, Callable, TextIO, Union
+
+from fortiori.edits import remove_unused_whitespace, record_edits, EditRecorder, EditedText
+from fortiori.emitter import emit_normalized
+from fortiori.exceptions import TranslationException
+from fortiori.lines import LineIndex
+from fortiori.operation import Operation, TreeOperation
+from fortiori.profiling import PipelineProfiler, PARSE, EMIT
+from fortiori.simple_operations import move_function_parameter_type_declaration_to_body, \
+    remove_line_splits_inside_blocks, strip_comments, \
+    move_variable_declaration_to_start_of_block, translate_return_statement, declare_invoked_function_return_types, \
+    add_implicit_none, rewrite_block_headers_and_pointers
+from fortiori.syntax import parse, reparse, SyntaxTree
+from fortiori.tree_operations import encode_case_sensitive_identifiers, replace_curly_brackets
+
+DECLARE_INVOKED_FUNCTION_RETURN_TYPES = Operation("declare_invoked_function_return_types",
+                                                  declare_invoked_function_return_types,
+                                                  ("function", "subroutine", "program"), cross_unit=True,
+                                                  parsed=True)
+
+DEFAULT_OPERATIONS = [
+    Operation("strip_comments", strip_comments, ("!",), parsed=True),
+    Operation("move_function_parameter_type_declaration_to_body", move_function_parameter_type_declaration_to_body,
+              ("function", "subroutine")),
+    Operation("move_variable_declaration_to_start_of_block", move_variable_declaration_to_start_of_block,
+              ("function", "subroutine", "program"), parsed=True),
+    DECLARE_INVOKED_FUNCTION_RETURN_TYPES,
+    Operation("translate_return_statement", translate_return_statement, ("return",), parsed=True),
+    Operation("remove_line_splits_inside_blocks", remove_line_splits_inside_blocks),
+    Operation("add_implicit_none", add_implicit_none, ("function", "subroutine", "program"), parsed=True),
+    Operation("rewrite_block_headers_and_pointers", rewrite_block_headers_and_pointers,
+              ("program", "if", "else", "cast(", "object"), parsed=True),
+    TreeOperation("encode_case_sensitive_identifiers", encode_case_sensitive_identifiers),
+    TreeOperation("replace_curly_brackets", replace_curly_brackets),
+    Operation("remove_unused_whitespace", remove_unused_whitespace),
+]
+
+
 class Transpiler(object):
 
-    def __init__(self, target: str):
+    def __init__(self, target: str = "fortran", operations: Optional[List[Operation]] = None):
         self.target = target
+        self.operations = list(operations if operations is not None else DEFAULT_OPERATIONS)
+
+    def register(self, operation: Operation) -> "Transpiler":
+        self.operations.append(operation)
+        return self
+
+    def configuration(self) -> str:
+        """Identifies the target and the registered operations, e.g. for cache keys."""
+        return ";".join([self.target] + [f"{operation.name}:{','.join(operation.triggers)}"
+                                         for operation in self.operations])
+
+    def is_cross_unit(self) -> bool:
+        return any(operation.cross_unit for operation in self.operations)
+
+    def transpile(self, text: str, signatures: Optional[Dict[str, Optional[str]]] = None,
+                  profiler: Optional[PipelineProfiler] = None) -> str:
+        """Returns the whole output as one string: only transpile_to with a file sink bounds the output memory.
+        signatures : Function signatures of the whole file, for cross-unit operations running on a single
+        program unit.
+        profiler : Measures every operation, parse and emit."""
+        sink = io.StringIO()
+        self.transpile_to(text, sink, signatures, profiler)
+        return sink.getvalue()
+
+    def transpile_to(self, text: str, sink: TextIO, signatures: Optional[Dict[str, Optional[str]]] = None,
+                     profiler: Optional[PipelineProfiler] = None):
+        """Writes the output to the sink. A final remove_unused_whitespace is applied while writing, in chunks,
+        rather than on a copy of the whole output."""
+        operations = self.operations
+        normalize = bool(operations) and operations[-1].function is remove_unused_whitespace
+        if normalize:
+            operations = operations[:-1]
+        source = self._apply(operations, text, signatures, profiler)
+
+        if normalize:
+            _run(profiler, self.operations[-1].name, emit_normalized, source, sink)
+        elif isinstance(source, SyntaxTree):
+            sink.write(_run(profiler, EMIT, SyntaxTree.emit, source))
+        else:
+            sink.write(source)
+
+    def _apply(self, operations: List[Operation], text: str, signatures: Optional[Dict[str, Optional[str]]],
+               profiler: Optional[PipelineProfiler]) -> Union[str, SyntaxTree]:
+        """The text after every operation, or its tree when the last operations rewrite a tree.
+        The text is parsed once, when an operation first needs its tree. The tree and the line starts are then
+        followed through the edits of each operation: only the edited lines are tokenized again, and errors raised
+        with a position get the line and column it comes from in the text."""
+        tree: Optional[SyntaxTree] = None
+        parsed: Optional[SyntaxTree] = None
+        lines: Optional[LineIndex] = LineIndex(text)
+        try:
+            for operation in operations:
+                if isinstance(operation, TreeOperation):
+                    if tree is None:
+                        tree = parsed if parsed is not None else _run(profiler, PARSE, parse, text)
+                        parsed = None
+                    tree = _run(profiler, operation.name, operation.apply, tree)
+                    continue
+                if tree is not None:
+                    text, tree, lines = _run(profiler, EMIT, SyntaxTree.emit, tree), None, None
+                if not operation.is_triggered_by(text):
+                    continue
+                if operation.parsed and parsed is None:
+                    parsed = _run(profiler, PARSE, parse, text)
+                with record_edits() as recorder:
+                    transpiled = _run(profiler, operation.name, operation.apply, text, signatures, parsed)
+                edit_chain = _edit_chain(text, transpiled, recorder)
+                lines = _follow(lines, edit_chain)
+                if parsed is not None:
+                    parsed = _run(profiler, PARSE, _reparse, parsed, edit_chain)
+                text = transpiled
+        except TranslationException as e:
+            if e.position is not None and e.line is None and lines is not None:
+                e.locate(*lines.location(e.position))
+            raise
+        return tree if tree is not None else text
+
+
+def _edit_chain(text: str, transpiled: str, recorder: EditRecorder) -> Optional[List[EditedText]]:
+    """The recorded edits leading from the text to the transpiled text, in order. None when the operation did not
+    go through apply_edits."""
+    chain = []
+    for edited, edits, result in recorder.calls:
+        if edited is text:
+            chain.append((edited, edits, result))
+            text = result
+    return chain if text is transpiled or text == transpiled else None
+
+
+def _follow(lines: Optional[LineIndex], edit_chain: Optional[List[EditedText]]) -> Optional[LineIndex]:
+    if lines is None or edit_chain is None:
+        return None
+    for _, edits, _ in edit_chain:
+        lines = lines.after_edits(edits)
+    return lines
+
+
+def _reparse(tree: SyntaxTree, edit_chain: Optional[List[EditedText]]) -> Optional[SyntaxTree]:
+    if edit_chain is None:
+        return None
+    for edited, edits, result in edit_chain:
+        tree = reparse(tree, edited, edits, result)
+    return tree
+
+
+def _run(profiler: Optional[PipelineProfiler], name: str, function: Callable, *args):
+    return function(*args) if profiler is None else profiler.measure(name, function, *args)
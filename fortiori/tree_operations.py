@@ -0,0 +1,79 @@
+import re
+from collections import OrderedDict
+from typing import Dict, List
+
+from fortiori.syntax import SyntaxTree, WORD
+
+
+class IdentifierEncodingCache(object):
+
+    def __init__(self, max_size: int = 65536):
+        """Least recently used encodings of mixed-case identifiers. One instance is shared by every file
+        transpiled in a process.
+        max_size : Number of identifiers kept."""
+        self.max_size = max_size
+        self.new_encodings = 0
+        self._encodings: Dict[str, str] = OrderedDict()
+
+    def encode(self, word: str) -> str:
+        encoding = self._encodings.get(word)
+        if encoding is not None:
+            self._encodings.move_to_end(word)
+            return encoding
+        encoding = _encode_character_case(word)
+        self.new_encodings += 1
+        self._add(word, encoding)
+        return encoding
+
+    def encodings(self) -> Dict[str, str]:
+        return dict(self._encodings)
+
+    def update(self, encodings: Dict[str, str]):
+        for word, encoding in encodings.items():
+            self._add(word, encoding)
+
+    def _add(self, word: str, encoding: str):
+        self._encodings[word] = encoding
+        if len(self._encodings) > self.max_size:
+            self._encodings.popitem(last=False)
+
+
+identifier_encodings = IdentifierEncodingCache()
+
+
+def encode_case_sensitive_identifiers(tree: SyntaxTree) -> SyntaxTree:
+    for token in tree.tokens:
+        if token.kind == WORD and token.text.lower() != token.text:
+            if "$" in token.text:
+                token.text = re.sub(r"\w+", lambda word: identifier_encodings.encode(word.group(0)), token.text)
+            else:
+                token.text = identifier_encodings.encode(token.text)
+    return tree
+
+
+def replace_curly_brackets(tree: SyntaxTree) -> SyntaxTree:
+    for block in tree.blocks():
+        block.opening_bracket.text = "\n"
+        block.closing_bracket.text = f"\nend {block.block_type};\n"
+    return tree
+
+
+def _encode_character_case(word: str) -> str:
+    """Shortest of two encodings: '$' after each upper case character, or '$$' wherever the case toggles."""
+    character_wise_encoding: List[str] = []
+    caps_lock_encoding: List[str] = []
+    caps_lock_state = False
+    for character in word:
+        lower = character.lower()
+        character_wise_encoding.append(lower + "$" if character.isupper() else character)
+        if (caps_lock_state is False and character.islower()) or (caps_lock_state is True and character.isupper()):
+            caps_lock_encoding.append(lower)
+        else:
+            caps_lock_state = not caps_lock_state
+            caps_lock_encoding.append(lower + "$$")
+
+    if caps_lock_state is True:
+        caps_lock_encoding.append("$$")
+
+    character_wise, caps_lock = "".join(character_wise_encoding), "".join(caps_lock_encoding)
+    return character_wise if len(character_wise) <= len(caps_lock) else caps_lock
@@ -6,6 +6,7 @@ from fortiori.exceptions import InvalidSymbolTypeDeclarationException
 
 
 class VariableDeclaration(object):
+    __slots__ = ("type", "identifier")
 
     def __init__(self, type: str, identifier: str):
         self.type = type
@@ -13,26 +14,39 @@ class VariableDeclaration(object):
 
 
 class FunctionBlock(object):
+    __slots__ = ("function_name", "block_start", "block_end", "source")
 
-    def __init__(self, function_name: str, block_start: int, block_end: int, block_content: str):
-        """block start/end : Opening and closing curly brackets."""
-        self.block_content = block_content
+    def __init__(self, function_name: str, block_start: int, block_end: int, source: str):
+        """block start/end : Opening and closing curly brackets.
+        source : Text the offsets refer to. The content is sliced from it only when it is read."""
         self.function_name = function_name
         self.block_start = block_start
         self.block_end = block_end
+        self.source = source
+
+    @property
+    def block_content(self) -> str:
+        return self.source[self.block_start:self.block_end]
 
 
 class CodeBlock(object):
+    __slots__ = ("block_type", "block_start", "block_end", "source")
 
-    def __init__(self, block_type: str, block_start: str, block_end: str, block_content: str):
-        """block start/end : Opening and closing curly brackets."""
+    def __init__(self, block_type: str, block_start: int, block_end: int, source: str):
+        """block start/end : Opening and closing curly brackets.
+        source : Text the offsets refer to. The content is sliced from it only when it is read."""
         self.block_type = block_type
-        self.block_content = block_content
         self.block_start = block_start
         self.block_end = block_end
+        self.source = source
+
+    @property
+    def block_content(self) -> str:
+        return self.source[self.block_start:self.block_end]
 
 
 class SymbolDeclaration(object):
+    __slots__ = ("symbol_name", "line")
 
     def __init__(self, symbol_name: str, line: str):
         self.symbol_name = symbol_name
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import time
+from concurrent.futures import Executor
+from typing import List, Dict, Tuple, Optional, Callable
+
+from fortiori.build import build, FileResult, BuildOptions, summarize_files
+from fortiori.modules import FileInterface, DependencyGraph
+
+SOURCE_EXTENSION = ".ff"
+
+
+class Watcher(object):
+
+    def __init__(self, paths: List[str]):
+        """paths : Source files, or directories searched recursively for .ff files."""
+        self.paths = paths
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._digests: Dict[str, str] = {}
+
+    def poll(self) -> List[str]:
+        """Source files which are new or whose content changed since the previous poll. A source which cannot be
+        read, e.g. removed or renamed by an editor saving it since it was listed, counts as removed until the next
+        poll finds it again."""
+        changed = []
+        sources = self._sources()
+        for source in sources:
+            try:
+                stat = os.stat(source)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if self._stats.get(source) == signature:
+                    continue
+                digest = _digest(source)
+            except OSError:
+                self._stats.pop(source, None)
+                self._digests.pop(source, None)
+                continue
+            self._stats[source] = signature
+            if self._digests.get(source) != digest:
+                self._digests[source] = digest
+                changed.append(source)
+
+        for removed in set(self._stats) - set(sources):
+            del self._stats[removed]
+            self._digests.pop(removed, None)
+        return changed
+
+    def _sources(self) -> List[str]:
+        sources = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                for directory, _, files in os.walk(path):
+                    sources.extend(os.path.join(directory, file) for file in sorted(files)
+                                   if file.endswith(SOURCE_EXTENSION))
+            else:
+                sources.append(path)
+        return sources
+
+
+def watch(paths: List[str], output_dir: str, interval: float = 0.5, options: BuildOptions = BuildOptions(),
+          executor: Optional[Executor] = None, report: Callable[[str], None] = print):
+    """Rebuilds changed files, and the files using their modules, until interrupted. The first poll builds every
+    source."""
+    watcher = Watcher(paths)
+    interfaces: Dict[str, FileInterface] = {}
+    try:
+        while True:
+            changed = watcher.poll()
+            if changed:
+                start = time.perf_counter()
+                graph, targets = rebuild_targets(interfaces, changed, options, executor)
+                results = build(targets, output_dir, options=options, executor=executor, graph=graph)
+                report(_rebuild_summary(results, time.perf_counter() - start))
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def rebuild_targets(interfaces: Dict[str, FileInterface], changed: List[str], options: BuildOptions = BuildOptions(),
+                    executor: Optional[Executor] = None) -> Tuple[DependencyGraph, List[str]]:
+    """Updates the interfaces of the changed files in place, then returns the new dependency graph along with the
+    files to rebuild: the changed files and every file depending on them."""
+    for removed in [path for path in interfaces if not os.path.exists(path)]:
+        del interfaces[removed]
+    for path in changed:
+        interfaces.pop(path, None)
+    interfaces.update(summarize_files(changed, options=options, executor=executor))
+
+    graph = DependencyGraph(interfaces)
+    affected = graph.affected_by(changed)
+    return graph, [path for path in changed if path not in interfaces] + [path for path in interfaces
+                                                                          if path in affected]
+
+
+def _rebuild_summary(results: List[FileResult], latency: float) -> str:
+    failures = sum(1 for result in results if not result.is_success())
+    return f"rebuilt {len(results)} file(s) in {latency * 1000:.1f} ms" + (f", {failures} failed" if failures else "")
+
+
+def _digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
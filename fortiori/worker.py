@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from typing import TextIO
+
+from fortiori.build import BuildOptions, FileResult, transpile_file, transpile_source, write_if_changed
+
+INLINE_SOURCE_NAME = "<inline>"
+REQUEST_FIELD_TYPES = {"input": str, "source": str, "name": str, "output": str, "incremental": bool}
+
+
+def serve(requests: TextIO, responses: TextIO, options: BuildOptions = BuildOptions()):
+    """Answers newline-delimited JSON requests until the end of the input, keeping every cache of this process warm
+    between requests. Each request is an object with:
+      input : Path of the file to transpile, or
+      source : Text to transpile.
+      name : Optional name of an inline source, used in errors.
+      output : Optional path to write the transpiled text to. It is returned in the response otherwise.
+      incremental : Optional, overrides the worker's setting.
+      id : Optional, echoed in the response.
+    Each response is an object with id, ok, text or output, error, line and column, the location of the error in
+    the source when known, cached, duration and diagnostics, the warnings printed while transpiling."""
+    for line in requests:
+        if line.strip():
+            responses.write(json.dumps(handle(line, options)) + "\n")
+            responses.flush()
+
+
+def handle(line: str, options: BuildOptions) -> dict:
+    start = time.perf_counter()
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return {"id": None, "ok": False, "error": f"InvalidRequest: {e}", "diagnostics": []}
+    if not isinstance(request, dict) or ("input" in request) == ("source" in request):
+        return {"id": request.get("id") if isinstance(request, dict) else None, "ok": False,
+                "error": "InvalidRequest: expected an object with either 'input' or 'source'", "diagnostics": []}
+    for field, expected_type in REQUEST_FIELD_TYPES.items():
+        if field in request and not isinstance(request[field], expected_type):
+            return {"id": request.get("id"), "ok": False, "diagnostics": [],
+                    "error": f"InvalidRequest: '{field}' must be a {expected_type.__name__}"}
+
+    request_options = BuildOptions(options.cache, request.get("incremental", options.incremental))
+    diagnostics = io.StringIO()
+    with redirect_stdout(diagnostics), redirect_stderr(diagnostics):
+        if "input" in request:
+            result = transpile_file(request["input"], request_options)
+        else:
+            result = transpile_source(request.get("name", INLINE_SOURCE_NAME), request["source"], request_options)
+        response = _response(request, result)
+
+    response["diagnostics"] = diagnostics.getvalue().splitlines()
+    response["duration"] = time.perf_counter() - start
+    return response
+
+
+def _response(request: dict, result: FileResult) -> dict:
+    response = {"id": request.get("id"), "ok": result.is_success(), "error": result.error, "line": result.line,
+                "column": result.column, "cached": result.cached}
+    if not result.is_success():
+        return response
+    output = request.get("output")
+    if output is None:
+        response["text"] = result.text
+        return response
+    try:
+        if os.path.dirname(output):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+        write_if_changed(output, result.text)
+        response["output"] = output
+    except OSError as e:
+        response.update(ok=False, error=f"{type(e).__name__}: {e}")
+    return response
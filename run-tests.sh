@@ -1,6 +1,7 @@
 #!/bin/sh
 
 export PYTHONPATH=$(pwd):$PYTHONPATH
+export FORTIORI_SCALING_TESTS=1
 
 startingDir=$(pwd)
 for dir in $(find test/ -type d)
@@ -14,5 +15,10 @@ do
     fi
     cd ${startingDir}
 done
+python -m benchmarks.regression
+if [ $? -ne "0" ]; then
+    echo "Output or performance regression. Stopping."
+    exit 1
+fi
 echo "All tests have passed."
 exit 0
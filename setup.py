@@ -40,7 +40,7 @@ setup(
     ],
 
     packages=find_packages(
-        exclude=['example', 'tests', 'tests.*']),
+        exclude=['example', 'tests', 'tests.*', 'benchmarks', 'benchmarks.*']),
 
     install_requires=[],
 )
@@ -0,0 +1,23 @@
+import os
+import tempfile
+import unittest
+
+
+class BuildSourcesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """A valid program, a file with an unbalanced bracket and a valid subroutine, in a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.directory.name, "out")
+        self.sources = [self._write("first.ff", "program {\n}"),
+                        self._write("broken.ff", "program {\n}\n}"),
+                        self._write("second.ff", "subroutine doThings() {\n}")]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
@@ -0,0 +1,22 @@
+import unittest
+
+from fortiori import transpile, transpile_many
+
+
+class ApiTest(unittest.TestCase):
+
+    def test_transpileText(self):
+        self.assertIn("end program;", transpile("program {\n}"))
+
+    def test_incrementalTranspilationMatchesWholeText(self):
+        text = "integer function one() {\n    return 1;\n}\nprogram {\n    integer::a = one();\n}\n"
+
+        self.assertEqual(transpile(text), transpile(text, incremental=True))
+
+    def test_transpileManyResolvesModulesAcrossTexts(self):
+        outputs = transpile_many({"main.ff": "program {\n    use geometry;\n    real::n = norm(1.0);\n}\n",
+                                  "geometry.ff": "module geometry {\n    real function norm(real::x) {\n"
+                                                 "        return x;\n    }\n}\n"})
+
+        self.assertEqual(["main.ff", "geometry.ff"], list(outputs))
+        self.assertNotIn("real::norm", outputs["main.ff"])
@@ -0,0 +1,50 @@
+import io
+import os
+from contextlib import redirect_stderr
+
+from fortiori.async_build import build_async
+from fortiori.build import build
+from fortiori.compat import run
+
+from build_sources import BuildSourcesTestCase
+
+
+class AsyncBuildTest(BuildSourcesTestCase):
+
+    def test_outputsMatchTheSynchronousBuild(self):
+        with redirect_stderr(io.StringIO()):
+            expected = [result.text for result in build(self.sources, self.output_dir)]
+            results, _ = run(build_async(self.sources, self.output_dir, io_concurrency=2, queue_depth=1))
+
+        self.assertEqual(expected, [result.text for result in results])
+
+    def test_failuresAreReportedInSourceOrder(self):
+        missing = os.path.join(self.directory.name, "missing.ff")
+        errors = io.StringIO()
+        with redirect_stderr(errors):
+            results, _ = run(build_async(self.sources + [missing], self.output_dir))
+
+        self.assertEqual(self.sources + [missing], [result.source_path for result in results])
+        self.assertEqual([True, False, True, False], [result.is_success() for result in results])
+        self.assertEqual(["broken.ff", "missing.ff"],
+                         [os.path.basename(line.split(":")[0]) for line in errors.getvalue().splitlines()])
+
+    def test_fileWhichCannotBeDecodedFailsOnItsOwn(self):
+        binary = os.path.join(self.directory.name, "binary.ff")
+        with open(binary, 'wb') as f:
+            f.write(b"program {\n\xff\xfe\n}")
+        with redirect_stderr(io.StringIO()):
+            results, _ = run(build_async([binary] + self.sources, self.output_dir))
+
+        self.assertEqual([False, True, False, True], [result.is_success() for result in results])
+        self.assertIn("UnicodeDecodeError", results[0].error)
+
+    def test_throughputCountsEveryFile(self):
+        with redirect_stderr(io.StringIO()):
+            _, throughput = run(build_async(self.sources, self.output_dir))
+
+        self.assertEqual(3, throughput.files)
+        self.assertEqual(sum(os.path.getsize(source) for source in self.sources), throughput.bytes_read)
+        self.assertEqual(sum(os.path.getsize(os.path.join(self.output_dir, name))
+                             for name in os.listdir(self.output_dir)), throughput.bytes_written)
+        self.assertIn("files/s", throughput.summary())
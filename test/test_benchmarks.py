@@ -0,0 +1,33 @@
+import unittest
+
+from benchmarks.corpus import generate_source, generate_source_of_size
+from benchmarks.run_benchmarks import growth_exponent, benchmark_size, PIPELINE
+from fortiori.transpiler import Transpiler
+
+
+class BenchmarksTest(unittest.TestCase):
+
+    def test_generatedSourceTranspiles(self):
+        actual = Transpiler().transpile(generate_source(3))
+
+        self.assertIn("end function;", actual)
+        self.assertIn("select type(a => shapep$ointer2)", actual)
+        self.assertIn("\"it's 2! {not a block}\"", actual)
+
+    def test_generatedSourceIsDeterministic(self):
+        self.assertEqual(generate_source(5, seed=3), generate_source(5, seed=3))
+
+    def test_generatedSourceHasRequestedSize(self):
+        lines = generate_source_of_size(1000).count("\n")
+
+        self.assertAlmostEqual(1000, lines, delta=100)
+
+    def test_growthExponent(self):
+        self.assertAlmostEqual(1.0, growth_exponent([1, 2, 4], [3, 6, 12]))
+        self.assertAlmostEqual(2.0, growth_exponent([1, 2, 4], [3, 12, 48]))
+
+    def test_peakMemoryIsRecordedOnRequest(self):
+        result = benchmark_size(50, repeat=1, nesting_depth=1, seed=0, memory=True)
+
+        self.assertGreater(result["peak_memory"][PIPELINE], result["peak_memory"]["parse"])
+        self.assertNotIn("peak_memory", benchmark_size(50, repeat=1, nesting_depth=1, seed=0))
@@ -0,0 +1,43 @@
+import unittest
+
+from fortiori.block_index import BlockIndex
+from fortiori.syntax import parse, Block
+
+
+class BlockIndexTest(unittest.TestCase):
+    SOURCE = """integer function myFunction() {
+        if (a == 2) {
+            print*, "}";
+        } else {
+            do i=1,10 {
+            }
+        }
+    }
+    program main {
+    }"""
+
+    def setUp(self):
+        self.index = BlockIndex(parse(self.SOURCE))
+
+    def test_blocksAreIndexedByOpeningBracket(self):
+        opening_bracket = self.SOURCE.index("{", self.SOURCE.index("if"))
+
+        block = self.index.block_opened_at(opening_bracket)
+
+        self.assertEqual("if", block.block_type)
+        self.assertEqual(self.SOURCE.index("} else"), block.block_end)
+        self.assertIsNone(self.index.block_opened_at(opening_bracket + 1))
+
+    def test_parentAndChildren(self):
+        function, program = self.index.top_level_blocks
+        else_block = self.index.blocks_of_type("else")[0]
+
+        self.assertEqual(["if", "else"], [child.block_type for child in function.children if isinstance(child, Block)])
+        self.assertIs(function, else_block.parent)
+        self.assertIsNone(program.parent)
+
+    def test_enclosingBlock(self):
+        self.assertEqual("do", self.index.enclosing_block(self.SOURCE.index("}", self.SOURCE.index("do"))).block_type)
+        self.assertEqual("else", self.index.enclosing_block(self.SOURCE.index("do")).block_type)
+        self.assertEqual("function", self.index.enclosing_block(self.SOURCE.index("} else") + 1).block_type)
+        self.assertIsNone(self.index.enclosing_block(self.SOURCE.index("program")))
@@ -0,0 +1,144 @@
+import os
+
+from fortiori.build import build, output_path, write_if_changed, BuildOptions, summarize_files
+from fortiori.cache import BuildCache
+from fortiori.modules import DependencyGraph
+from fortiori.transpiler import Transpiler
+from fortiori.tree_operations import identifier_encodings
+
+from build_sources import BuildSourcesTestCase
+
+
+class BuildTest(BuildSourcesTestCase):
+
+    def test_eachFileIsWrittenToItsOwnOutput(self):
+        build(self.sources, self.output_dir)
+
+        self.assertEqual(["first.f90", "second.f90"], sorted(os.listdir(self.output_dir)))
+        with open(os.path.join(self.output_dir, "second.f90")) as f:
+            self.assertIn("end subroutine;", f.read())
+
+    def test_failureIsReportedWithoutStoppingOtherFiles(self):
+        results = build(self.sources, self.output_dir)
+
+        self.assertEqual(self.sources, [result.source_path for result in results])
+        self.assertEqual([True, False, True], [result.is_success() for result in results])
+
+    def test_failureIsLocatedInItsSource(self):
+        results = build(self.sources, self.output_dir)
+
+        self.assertEqual((3, 1), (results[1].line, results[1].column))
+        self.assertTrue(results[1].describe().startswith(f"{self.sources[1]}:3:1: UnbalancedBracketException"))
+
+    def test_unreadableFileDoesNotStopOtherFiles(self):
+        binary = os.path.join(self.directory.name, "binary.ff")
+        with open(binary, 'wb') as f:
+            f.write(b"program {\n\xff\xfe\n}")
+
+        results = build([binary] + self.sources, self.output_dir)
+
+        self.assertEqual([False, True, False, True], [result.is_success() for result in results])
+        self.assertIn("UnicodeDecodeError", results[0].error)
+
+    def test_filesWhichWouldShareAnOutputFail(self):
+        os.makedirs(os.path.join(self.directory.name, "other"))
+        duplicate = self._write(os.path.join("other", "first.ff"), "subroutine doOtherThings() {\n}")
+
+        results = build(self.sources + [duplicate], self.output_dir)
+        rebuilt = build([duplicate], self.output_dir, graph=DependencyGraph(summarize_files(self.sources + [duplicate])))
+
+        self.assertEqual([False, False, True, False], [result.is_success() for result in results])
+        self.assertIn("ConflictingOutputPathException", results[0].error)
+        self.assertFalse(rebuilt[0].is_success())
+        self.assertEqual(["second.f90"], os.listdir(self.output_dir))
+
+    def test_parallelBuildMatchesSerialBuild(self):
+        serial = [result.text for result in build(self.sources, self.output_dir, jobs=1)]
+        parallel = [result.text for result in build(self.sources, self.output_dir, jobs=2)]
+
+        self.assertEqual(serial, parallel)
+
+    def test_splitUnitsBuildMatchesSerialBuild(self):
+        self._write("first.ff", "subroutine a() {\n}\nsubroutine b() {\n}\nprogram {\n    call a();\n}\n")
+        serial = [result.text for result in build(self.sources, self.output_dir, jobs=1)]
+        split = [result.text for result in build(self.sources, self.output_dir, jobs=2,
+                                                 options=BuildOptions(split_units=True))]
+
+        self.assertEqual(serial, split)
+
+    def test_splitUnitsBuildMatchesSerialBuildOnHeadersSpanningLines(self):
+        self._write("first.ff", "integer function add(integer::a,\n        integer::b) {\n    add = a + b;\n}\n"
+                                "program {\n    integer::x = add(1, 2);\n}\n")
+        serial = [result.text for result in build(self.sources, self.output_dir, jobs=1)]
+        split = [result.text for result in build(self.sources, self.output_dir, jobs=2,
+                                                 options=BuildOptions(split_units=True))]
+
+        self.assertIn("integer::add;", serial[0])
+        self.assertEqual(serial, split)
+
+    def test_unchangedFilesAreServedFromCache(self):
+        cache = BuildCache(os.path.join(self.directory.name, "cache"))
+        first = build(self.sources, self.output_dir, options=BuildOptions(cache))
+
+        second = build(self.sources, self.output_dir, options=BuildOptions(cache))
+
+        self.assertEqual([False, False, False], [result.cached for result in first])
+        self.assertEqual([True, False, True], [result.cached for result in second])
+        self.assertEqual([result.text for result in first], [result.text for result in second])
+
+    def test_changedFileIsTranspiledAgain(self):
+        cache = BuildCache(os.path.join(self.directory.name, "cache"))
+        build(self.sources, self.output_dir, options=BuildOptions(cache))
+        self._write("first.ff", "program {\n}\n")
+
+        results = build(self.sources, self.output_dir, options=BuildOptions(cache))
+
+        self.assertEqual([False, False, True], [result.cached for result in results])
+
+    def test_identifierEncodingsArePersistedWithTheCache(self):
+        cache = BuildCache(os.path.join(self.directory.name, "cache"))
+        self._write("first.ff", "program {\n    integer::aVariable = 1;\n}")
+
+        build(self.sources, self.output_dir, options=BuildOptions(cache))
+
+        self.assertEqual("av$ariable", cache.load_identifier_encodings().get("aVariable"))
+        self.assertEqual(0, identifier_encodings.new_encodings)
+
+    def test_moduleProceduresUsedFromAnotherFileAreNotRedeclared(self):
+        main = self._write("main.ff", "program {\n    use geometry;\n    real::n = norm(1.0);\n}\n")
+        geometry = self._write("geometry.ff", "module geometry {\n    real function norm(real::x) {\n"
+                                              "        return x;\n    }\n}\n")
+
+        results = build([main, geometry], self.output_dir)
+
+        self.assertEqual([True, True], [result.is_success() for result in results])
+        self.assertNotIn("real::norm", results[0].text)
+
+    def test_functionsWithHeadersSpanningSeveralLinesAreDeclared(self):
+        source = "integer function add(integer::a,\n        integer::b) {\n    add = a + b;\n}\n" \
+                 "program {\n    integer::x = add(1, 2);\n}\n"
+        path = self._write("add.ff", source)
+
+        results = build([path], self.output_dir)
+
+        self.assertIn("integer::add;", results[0].text)
+        self.assertEqual(Transpiler().transpile(source), results[0].text)
+
+    def test_filesOnADependencyCycleFail(self):
+        first = self._write("a.ff", "module a {\n    use b;\n}\n")
+        second = self._write("b.ff", "module b {\n    use a;\n}\n")
+
+        results = build([first, second] + self.sources, self.output_dir)
+
+        self.assertEqual([False, False, True, False, True], [result.is_success() for result in results])
+        self.assertIn("CyclicModuleDependencyException", results[0].error)
+
+    def test_identicalOutputIsNotRewritten(self):
+        path = os.path.join(self.directory.name, "output.f90")
+
+        self.assertTrue(write_if_changed(path, "end program;"))
+        self.assertFalse(write_if_changed(path, "end program;"))
+        self.assertTrue(write_if_changed(path, "end program; "))
+
+    def test_outputPathKeepsBaseName(self):
+        self.assertEqual(os.path.join("out", "kernel.f90"), output_path(os.path.join("src", "kernel.ff"), "out"))
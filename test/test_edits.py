@@ -0,0 +1,28 @@
+import unittest
+
+from fortiori.edits import CodeEdit, apply_edits
+from fortiori.exceptions import OverlappingCodeEditsException
+
+
+class ApplyEditsTest(unittest.TestCase):
+
+    def test_editsAreAppliedRelativeToOriginalText(self):
+        text = "integer::aVariable = 5;"
+        edits = [CodeEdit(21, 22, "10"), CodeEdit(9, 18, "a"), CodeEdit(0, 0, "\n")]
+
+        actual = apply_edits(text, edits)
+
+        self.assertEqual("\ninteger::a = 10;", actual)
+
+    def test_insertionsAtSamePositionKeepTheirOrder(self):
+        actual = apply_edits("{}", [CodeEdit(1, 1, "a"), CodeEdit(1, 1, "b"), CodeEdit(1, 2, "c")])
+
+        self.assertEqual("{abc", actual)
+
+    def test_overlappingEditsAreRejected(self):
+        with self.assertRaises(OverlappingCodeEditsException):
+            apply_edits("end if", [CodeEdit(0, 3, ""), CodeEdit(2, 4, "x")])
+
+    def test_replacementsAtSamePositionAreRejected(self):
+        with self.assertRaises(OverlappingCodeEditsException):
+            apply_edits("}", [CodeEdit(0, 1, ""), CodeEdit(0, 1, "end if;")])
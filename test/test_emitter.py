@@ -0,0 +1,32 @@
+import io
+import unittest
+
+from fortiori.edits import remove_unused_whitespace
+from fortiori.emitter import emit_normalized
+from fortiori.syntax import parse
+
+
+class EmitNormalizedTest(unittest.TestCase):
+
+    def test_outputMatchesRemoveUnusedWhitespace(self):
+        text = "  \n program  {\n\n   integer::a;  \n\t x  =  1;\n}\n\n "
+
+        for chunk_size in (1, 2, 3, 7, 1000):
+            sink = io.StringIO()
+            emit_normalized(text, sink, chunk_size)
+            self.assertEqual(remove_unused_whitespace(text), sink.getvalue())
+
+    def test_runsSplitBetweenChunksAreCollapsed(self):
+        sink = io.StringIO()
+
+        emit_normalized("a    \n\n\n    b", sink, chunk_size=2)
+
+        self.assertEqual("a \n b", sink.getvalue())
+
+    def test_treeTokensAreWrittenWithoutEmittingTheTree(self):
+        text = "program {\n\n  integer::a;\n}\n"
+        sink = io.StringIO()
+
+        emit_normalized(parse(text), sink, chunk_size=4)
+
+        self.assertEqual(remove_unused_whitespace(text), sink.getvalue())
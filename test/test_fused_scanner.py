@@ -0,0 +1,58 @@
+import unittest
+
+from fortiori.edits import CodeEdit
+from fortiori.fused_scanner import ScanHandler, FusedScanner, scan
+from fortiori.simple_operations import rewrite_block_headers_and_pointers, add_name_to_unnamed_program_blocks, \
+    convert_conditional_blocks, inline_pointer_cast_function, replace_object_reference_type_declaration
+
+
+class FusedScannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.contexts = []
+
+    def test_matchesInsideAnotherHandlersMatchAreKept(self):
+        words = self._handler("words", r"\w+")
+        arguments = self._handler("arguments", r"\(\w+\)")
+
+        matches = [(edit.inserted_text, edit.start_pos)
+                   for edit in FusedScanner((words, arguments)).edits("a fn(b)")]
+
+        self.assertEqual([("words", 0), ("words", 2), ("arguments", 4), ("words", 5)],
+                         sorted(matches, key=lambda match: match[1]))
+
+    def test_handlersShareOneContext(self):
+        FusedScanner((self._handler("first", "a"), self._handler("second", "b"))).edits("ab")
+
+        self.assertEqual(2, len(self.contexts))
+        self.assertIs(self.contexts[0], self.contexts[1])
+
+    def test_handlersWhichAreNotTriggeredAreSkipped(self):
+        actual = scan("abc", (ScanHandler("never", "b", lambda match, context: [CodeEdit(1, 2, "x")], ("z",)),))
+
+        self.assertEqual("abc", actual)
+
+    def test_fusedRewritesMatchSequentialPasses(self):
+        text = """
+program {
+integer::Count;
+Shape,object::currentShape;
+if (Count > 1) {
+currentShape = cast(shapePointer);
+} else {
+print*, "small";
+}
+}"""
+        sequential = text
+        for operation in (add_name_to_unnamed_program_blocks, convert_conditional_blocks,
+                          inline_pointer_cast_function, replace_object_reference_type_declaration):
+            sequential = operation(sequential)
+
+        self.assertEqual(sequential, rewrite_block_headers_and_pointers(text))
+
+    def _handler(self, name: str, pattern: str) -> ScanHandler:
+        def handle(match, context):
+            self.contexts.append(context)
+            return [CodeEdit(match.start(), match.start(), name)]
+
+        return ScanHandler(name, pattern, handle, (name,))
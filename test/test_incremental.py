@@ -0,0 +1,127 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from fortiori.exceptions import CannotFindSymbolDeclarationException, UnbalancedBracketException
+from fortiori.incremental import IncrementalTranspiler, split_units, transpile_units
+from fortiori.operation import Operation
+from fortiori.transpiler import Transpiler
+
+SOURCE = """integer function addOne(integer::x) {
+    return x + 1;
+}
+subroutine doThings() { print*, "a"; }
+program {
+    integer::Total = addOne(3);
+}
+"""
+
+MULTILINE_HEADER_SOURCE = """integer function add(integer::a,
+        integer::b) {
+    add = a + b;
+}
+program {
+    integer::x = add(1, 2);
+}
+"""
+HEADER_ON_CLOSING_LINE_SOURCE = """integer function f(integer::a) {
+    f = a;
+} real function g(real::b,
+        real::c) {
+    g = b + c;
+}
+program {
+    real::y = g(2.0, 1.0) + f(1);
+}
+"""
+
+
+class IncrementalTranspilerTest(unittest.TestCase):
+
+    def test_splitAtLinesClosingTopLevelUnits(self):
+        units = split_units(SOURCE)
+
+        self.assertEqual(SOURCE, "".join(units))
+        self.assertEqual(3, len(units))
+        self.assertTrue(units[1].startswith("subroutine"))
+
+    def test_unitsSharingALineStayTogether(self):
+        text = "subroutine a() {\n} subroutine b() {\n}\nprogram {\n}"
+
+        self.assertEqual(["subroutine a() {\n} subroutine b() {\n}\n", "program {\n}"], split_units(text))
+
+    def test_headerStartingOnAClosingLineStaysWithItsUnit(self):
+        units = split_units(HEADER_ON_CLOSING_LINE_SOURCE)
+
+        self.assertEqual(2, len(units))
+        self.assertTrue(units[0].endswith("g = b + c;\n}\n"))
+
+    def test_outputIsIdenticalToWholeFileTranspilation(self):
+        transpiler = Transpiler()
+
+        self.assertEqual(transpiler.transpile(SOURCE), IncrementalTranspiler(transpiler).transpile(SOURCE))
+
+    def test_onlyChangedUnitsAreTranspiledAgain(self):
+        transpiled = []
+        incremental = IncrementalTranspiler(Transpiler(operations=[
+            Operation("record", lambda text: transpiled.append(text) or text)]))
+        incremental.transpile(SOURCE)
+
+        incremental.transpile(SOURCE.replace("Total = addOne(3)", "Total = addOne(4)"))
+
+        self.assertEqual(4, len(transpiled))
+        self.assertIn("addOne(4)", transpiled[-1])
+
+    def test_crossUnitOperationsReceiveSignaturesOfWholeFile(self):
+        transpiler = Transpiler()
+
+        actual = IncrementalTranspiler(transpiler).transpile(SOURCE)
+
+        self.assertIn("integer::addo$ne;", actual)
+        self.assertEqual(transpiler.transpile(SOURCE), actual)
+
+    def test_unitsTranspiledInParallelAreJoinedInOrder(self):
+        transpiler = Transpiler()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            actual = transpile_units(transpiler, SOURCE, executor, jobs=1)
+
+        self.assertEqual(transpiler.transpile(SOURCE), actual)
+
+    def test_errorsAreLocatedInTheWholeFile(self):
+        source = SOURCE + "subroutine broken() {\n  p = cast(q)\n}\n"
+        transpiler = Transpiler()
+
+        with self.assertRaises(CannotFindSymbolDeclarationException) as context:
+            IncrementalTranspiler(transpiler).transpile(source)
+        with self.assertRaises(CannotFindSymbolDeclarationException) as parallel_context:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                transpile_units(transpiler, source, executor, jobs=1)
+
+        self.assertEqual(9, context.exception.line)
+        self.assertEqual(9, parallel_context.exception.line)
+
+    def test_unbalancedBracketIsLocatedBeforeSplitting(self):
+        with self.assertRaises(UnbalancedBracketException) as context:
+            IncrementalTranspiler(Transpiler()).transpile("program {\n}\n}")
+
+        self.assertEqual((3, 1), (context.exception.line, context.exception.column))
+
+    def test_trailingBlankLinesAndCommentsAddNoLine(self):
+        transpiler = Transpiler()
+        for source in (SOURCE + "\n\n", SOURCE + "! done\n"):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                split = transpile_units(transpiler, source, executor, jobs=1)
+
+            self.assertEqual(transpiler.transpile(source), IncrementalTranspiler(transpiler).transpile(source))
+            self.assertEqual(transpiler.transpile(source), split)
+
+    def test_functionsWithHeadersSpanningLinesOrSharingAClosingLineAreDeclared(self):
+        transpiler = Transpiler()
+        for source, declaration in ((MULTILINE_HEADER_SOURCE, "integer::add;"),
+                                    (HEADER_ON_CLOSING_LINE_SOURCE, "real::g;")):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                split = transpile_units(transpiler, source, executor, jobs=2)
+
+            self.assertIn(declaration, transpiler.transpile(source))
+            self.assertEqual(transpiler.transpile(source), IncrementalTranspiler(transpiler).transpile(source))
+            self.assertEqual(transpiler.transpile(source), split)
@@ -0,0 +1,36 @@
+import unittest
+
+from fortiori.lexical import LexicalIndex
+
+
+class LexicalIndexTest(unittest.TestCase):
+
+    def test_positionsInsideStringLiterals(self):
+        text = """print*, "a{b", 'c'"""
+        index = LexicalIndex(text)
+
+        self.assertFalse(index.is_inside_string(text.index('"')))
+        self.assertTrue(index.is_inside_string(text.index("{")))
+        self.assertTrue(index.is_inside_string(text.rindex('"')))
+        self.assertTrue(index.is_inside_string(text.index("c")))
+        self.assertFalse(index.is_inside_string(text.index(",")))
+
+    def test_otherQuoteTypeInsideStringDoesNotOpenString(self):
+        text = """print*, "don't"; aVariable = 1;"""
+        index = LexicalIndex(text)
+
+        self.assertFalse(index.is_inside_string(text.index("aVariable")))
+
+    def test_unterminatedStringEndsAtEndOfLine(self):
+        text = """print*, "oops
+        aVariable = 1;"""
+        index = LexicalIndex(text)
+
+        self.assertFalse(index.is_inside_string(text.index("aVariable")))
+
+    def test_commentMarkersInsideStringsAreIgnored(self):
+        text = """print*, "!", "stuff" ! a comment "with quotes"""
+        index = LexicalIndex(text)
+
+        self.assertTrue(index.is_inside_string(text.index("stuff")))
+        self.assertFalse(index.is_inside_string(text.index("with")))
@@ -0,0 +1,55 @@
+import unittest
+
+from fortiori.edits import CodeEdit, apply_edits
+from fortiori.lines import LineIndex
+
+TEXT = "program {\n  integer::a\n\n  a = 1\n}"
+
+
+class LineIndexTest(unittest.TestCase):
+
+    def test_locationIsTheOneBasedLineAndColumn(self):
+        index = LineIndex(TEXT)
+
+        self.assertEqual((1, 1), index.location(0))
+        self.assertEqual((4, 3), index.location(TEXT.index("a = 1")))
+        self.assertEqual((5, 1), index.location(len(TEXT) - 1))
+
+    def test_spansAreThePiecesOfTheSplitText(self):
+        index = LineIndex(TEXT)
+
+        for start, end in [(0, None), (3, 20), (10, 11), (TEXT.index("\n\n"), TEXT.index("\n\n") + 2)]:
+            expected = TEXT[start:end].split("\n")
+            self.assertEqual(expected, [TEXT[piece_start:piece_end]
+                                        for piece_start, piece_end in index.spans(start, end)])
+
+    def test_indexAfterEditsMatchesAFreshScan(self):
+        edits = [CodeEdit(TEXT.index("\n  integer"), TEXT.index("  integer"), ""),
+                 CodeEdit(TEXT.index("a = 1"), TEXT.index("a = 1"), "b = 2\n  ")]
+        edited = apply_edits(TEXT, edits)
+
+        index = LineIndex(TEXT).after_edits(edits)
+
+        self.assertEqual(LineIndex(edited).starts, index.starts)
+        self.assertEqual(len(edited), index.length)
+
+    def test_linesFollowTheirOriginThroughEdits(self):
+        edits = [CodeEdit(TEXT.index("\n  integer"), TEXT.index("  integer"), ""),
+                 CodeEdit(0, 0, "! header\n")]
+        edited = apply_edits(TEXT, edits)
+
+        index = LineIndex(TEXT).after_edits(edits)
+
+        self.assertEqual((4, 3), index.location(edited.index("a = 1")))
+        self.assertEqual(1, index.location(0)[0])
+
+    def test_lineLeftStartingAtADeletionKeepsItsOwnOrigin(self):
+        index = LineIndex("a\nbb\ncc\n").after_edits([CodeEdit(2, 5, "")])
+
+        self.assertEqual((3, 1), index.location(2))
+
+    def test_lineStartingAfterAnInsertedNewlineKeepsItsOwnOrigin(self):
+        index = LineIndex("a\nbb\ncc\n").after_edits([CodeEdit(2, 5, "b\n")])
+
+        self.assertEqual((2, 1), index.location(2))
+        self.assertEqual((3, 1), index.location(4))
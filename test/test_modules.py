@@ -0,0 +1,71 @@
+import unittest
+
+from fortiori.exceptions import CyclicModuleDependencyException
+from fortiori.modules import summarize, DependencyGraph, FileInterface
+
+GEOMETRY = """module geometry {
+    type Point {
+        real::x;
+    }
+    real function norm(real::x) {
+        return x;
+    }
+}
+"""
+PROGRAM = """use geometry;
+use iso_c_binding;
+integer function helper() {
+    return 1;
+}
+program {
+    print*, "use notAModule";
+}
+"""
+
+
+class ModulesTest(unittest.TestCase):
+
+    def test_interfaceListsModuleFunctionsAndTypes(self):
+        interface = summarize(GEOMETRY)
+
+        self.assertEqual(["geometry"], [module.name for module in interface.modules])
+        self.assertEqual({"norm": "real"}, interface.modules[0].functions)
+        self.assertEqual(["Point"], interface.modules[0].types)
+
+    def test_moduleProceduresHaveNoSignatureToDeclare(self):
+        self.assertEqual({"norm": None}, summarize(GEOMETRY).signatures)
+
+    def test_useStatementsOutsideStringsAreListed(self):
+        self.assertEqual(["geometry", "iso_c_binding"], summarize(PROGRAM).uses)
+
+    def test_interfaceSurvivesJsonRoundTrip(self):
+        interface = FileInterface.from_json(summarize(GEOMETRY).to_json())
+
+        self.assertEqual({"norm": "real"}, interface.modules[0].functions)
+        self.assertEqual(["Point"], interface.modules[0].types)
+
+
+class DependencyGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = DependencyGraph({"main.ff": summarize(PROGRAM),
+                                      "geometry.ff": summarize(GEOMETRY),
+                                      "other.ff": summarize("program {\n}\n")})
+
+    def test_filesComeAfterTheModulesTheyUse(self):
+        self.assertEqual([["geometry.ff", "other.ff"], ["main.ff"]],
+                         self.graph.levels(["main.ff", "geometry.ff", "other.ff"]))
+
+    def test_dependentsAreAffectedByAChange(self):
+        self.assertEqual({"geometry.ff", "main.ff"}, self.graph.affected_by(["geometry.ff"]))
+        self.assertEqual({"main.ff"}, self.graph.affected_by(["main.ff"]))
+
+    def test_importedModuleProceduresAreVisible(self):
+        self.assertEqual({"helper": "integer", "norm": None}, self.graph.signatures("main.ff"))
+
+    def test_cyclicDependencyRaises(self):
+        graph = DependencyGraph({"a.ff": summarize("use b;\nmodule a {\n}\n"),
+                                 "b.ff": summarize("use a;\nmodule b {\n}\n")})
+
+        with self.assertRaises(CyclicModuleDependencyException):
+            graph.levels(["a.ff", "b.ff"])
@@ -0,0 +1,56 @@
+import unittest
+
+from fortiori.edits import CodeEdit, apply_edits
+from fortiori.operation import Operation, TreeOperation
+from fortiori.profiling import PipelineProfiler, PARSE, EMIT
+from fortiori.transpiler import Transpiler
+
+
+class PipelineProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = PipelineProfiler(trace_memory=False)
+        self.profiler.current_file = "a.ff"
+
+    def test_recordsOnePassPerOperation(self):
+        transpiler = Transpiler(operations=[Operation("upper", str.upper), Operation("strip", str.strip)])
+
+        transpiler.transpile(" abc ", profiler=self.profiler)
+
+        self.assertEqual(["upper", "strip"], [record.name for record in self.profiler.records])
+        self.assertEqual([5, 3], [record.output_size for record in self.profiler.records])
+        self.assertEqual({"a.ff"}, {record.file for record in self.profiler.records})
+
+    def test_recordsParseAndEmitAroundTreeOperations(self):
+        transpiler = Transpiler(operations=[TreeOperation("identity", lambda tree: tree)])
+
+        transpiler.transpile("program {}", profiler=self.profiler)
+
+        self.assertEqual([PARSE, "identity", EMIT], [record.name for record in self.profiler.records])
+
+    def test_countsProducedAndAppliedEdits(self):
+        insert_twice = lambda text: apply_edits(text, [CodeEdit(0, 0, "a"), CodeEdit(1, 1, "b")])
+        transpiler = Transpiler(operations=[Operation("insert", insert_twice)])
+
+        transpiler.transpile("xy", profiler=self.profiler)
+
+        record = self.profiler.records[0]
+        self.assertEqual((2, 2), (record.edits_produced, record.edits_applied))
+
+    def test_tracesPeakMemory(self):
+        profiler = PipelineProfiler()
+        transpiler = Transpiler(operations=[Operation("grow", lambda text: text * 1000)])
+
+        transpiler.transpile("abc", profiler=profiler)
+
+        self.assertGreaterEqual(profiler.records[0].peak_memory, 3000)
+
+    def test_summaryHasOneLinePerPass(self):
+        transpiler = Transpiler(operations=[Operation("upper", str.upper)])
+        transpiler.transpile("abc", profiler=self.profiler)
+        transpiler.transpile("def", profiler=self.profiler)
+
+        lines = self.profiler.summary().splitlines()
+
+        self.assertEqual(2, len(lines))
+        self.assertEqual(["upper", "2"], lines[1].split()[:2])
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.regression import check_outputs, compare
+
+
+class RegressionTest(unittest.TestCase):
+    BASELINE = {"calibration": 1.0, "passes": {"strip_comments": {"seconds": 0.1, "peak_memory": 1000}}}
+
+    def test_goldenOutputsAreUpToDate(self):
+        self.assertEqual([], check_outputs())
+
+    def test_changedOutputIsReported(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "source.ff")
+            with open(source, 'w') as f:
+                f.write("program {\n}")
+            with open(os.path.join(directory, "source.f90"), 'w') as f:
+                f.write("program main\nend program;")
+
+            failures = check_outputs([source], directory)
+
+        self.assertEqual(1, len(failures))
+        self.assertIn("output differs", failures[0])
+
+    def test_slowerPassIsReported(self):
+        current = {"calibration": 1.0, "passes": {"strip_comments": {"seconds": 0.5, "peak_memory": 1000}}}
+
+        regressions = compare(self.BASELINE, current, time_threshold=3.0, memory_threshold=1.5)
+
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith("strip_comments: 0.5000s"))
+
+    def test_baselineIsScaledToTheMachine(self):
+        current = {"calibration": 2.0, "passes": {"strip_comments": {"seconds": 0.5, "peak_memory": 1000}}}
+
+        self.assertEqual([], compare(self.BASELINE, current, time_threshold=3.0, memory_threshold=1.5))
+
+    def test_largerPeakMemoryIsReported(self):
+        current = {"calibration": 1.0, "passes": {"strip_comments": {"seconds": 0.1, "peak_memory": 2000}}}
+
+        regressions = compare(self.BASELINE, current, time_threshold=3.0, memory_threshold=1.5)
+
+        self.assertEqual(1, len(regressions))
+        self.assertIn("peak 0.0 MB", regressions[0])
@@ -0,0 +1,66 @@
+import gc
+import inspect
+import io
+import os
+import time
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Callable, List
+
+from benchmarks.corpus import generate_source_of_size
+from benchmarks.run_benchmarks import growth_exponent
+from fortiori import simple_operations
+from fortiori.edits import CodeEdit, apply_edits
+
+SIZES = [250, 500, 1000, 2000]
+REPEAT = 3
+MAX_EXPONENT = float(os.environ.get("FORTIORI_SCALING_EXPONENT", 1.35))
+
+
+def passes() -> List[Callable]:
+    """Every public function of simple_operations, so that new passes are covered as they are added."""
+    return [function for name, function in inspect.getmembers(simple_operations, inspect.isfunction)
+            if function.__module__ == simple_operations.__name__ and not name.startswith("_")]
+
+
+def best_time(function: Callable, *args) -> float:
+    """Best time over the repetitions, with the cyclic garbage collector paused. Its collections grow with the
+    number of live objects rather than with the work of the pass, and would hide the pass's own growth."""
+    best = float("inf")
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        for _ in range(REPEAT):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                function(*args)
+                best = min(best, time.perf_counter() - start)
+            finally:
+                gc.enable()
+    return best
+
+
+@unittest.skipUnless(os.environ.get("FORTIORI_SCALING_TESTS"), "set FORTIORI_SCALING_TESTS=1 to run")
+class ScalingTest(unittest.TestCase):
+    """Runs each pass on inputs of doubling size and fails when its fitted growth exponent exceeds MAX_EXPONENT:
+    n log n with some room for timing noise, well below a quadratic pass's 2."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.texts = [generate_source_of_size(lines) for lines in SIZES]
+
+    def test_simpleOperationsGrowNearLinearly(self):
+        for function in passes():
+            with self.subTest(function.__name__):
+                seconds = [best_time(function, text) for text in self.texts]
+
+                self.assertLessEqual(growth_exponent([len(text) for text in self.texts], seconds), MAX_EXPONENT,
+                                     f"{function.__name__} took {seconds}")
+
+    def test_applyEditsGrowsNearLinearly(self):
+        edits = [[CodeEdit(position, position + 1, "$$") for position in range(0, len(text), 10)]
+                 for text in self.texts]
+
+        seconds = [best_time(apply_edits, text, text_edits) for text, text_edits in zip(self.texts, edits)]
+
+        self.assertLessEqual(growth_exponent([len(text) for text in self.texts], seconds), MAX_EXPONENT)
@@ -0,0 +1,28 @@
+import re
+import unittest
+
+from fortiori.scanning import matching_parenthesis, find_line_matches
+
+USE_STATEMENT = re.compile(r"^\s*use .*$", flags=re.M)
+
+
+class ScanningTest(unittest.TestCase):
+
+    def test_matchingParenthesisSkipsNestedPairs(self):
+        text = "f(a, g(b), (c)) + d"
+
+        self.assertEqual(text.index(" +") - 1, matching_parenthesis(text, text.index("(") + 1))
+
+    def test_unclosedParenthesisHasNoMatch(self):
+        self.assertIsNone(matching_parenthesis("f(a, g(b)", 2))
+
+    def test_lineMatchesAreTheSameAsInASlice(self):
+        text = "module a { use b;\n  use c;\n}\nuse d;"
+        start, end = text.index("{") + 1, text.index("}")
+
+        expected = [(match.start() + start, match.end() + start)
+                    for match in USE_STATEMENT.finditer(text[start:end])]
+        actual = [(match.start(), match.end()) for match in find_line_matches(USE_STATEMENT, text, start, end)]
+
+        self.assertEqual(2, len(actual))
+        self.assertEqual(expected, actual)
@@ -1,5 +1,7 @@
+import io
 import re
 import unittest
+from contextlib import redirect_stderr
 
 from jivago_streams import Stream
 
@@ -7,7 +9,7 @@ from fortiori.simple_operations import remove_curly_brackets, strip_comments, re
     move_function_parameter_type_declaration_to_body, move_variable_declaration_to_start_of_block, \
     translate_return_statement, declare_invoked_function_return_types, add_implicit_none, \
     add_name_to_unnamed_program_blocks, translate_case_sensitive_identifier, convert_conditional_blocks, \
-    replace_object_reference_type_declaration, inline_pointer_cast_function
+    replace_object_reference_type_declaration, inline_pointer_cast_function, function_signatures
 
 
 class SimpleOperationsTest(unittest.TestCase):
@@ -160,6 +162,82 @@ class SimpleOperationsTest(unittest.TestCase):
 
         self.assertEqualIgnoreWhitespace(expected, actual)
 
+    def test_declareEachInvokedFunctionOncePerBlock(self):
+        input = """integer function factorial(integer::n) {
+        factorial(n - 1) * n;
+        }
+        program {
+        factorial(3);
+        factorial(4);
+        call doThings();
+        }
+        """
+        expected = """integer function factorial(integer::n) {
+        factorial(n - 1) * n;
+        }
+        program {
+        integer::factorial;
+        factorial(3);
+        factorial(4);
+        call doThings();
+        }"""
+
+        actual = declare_invoked_function_return_types(input)
+
+        self.assertEqualIgnoreWhitespace(expected, actual)
+
+    def test_declareEveryFunctionInvokedOnALine(self):
+        input = """integer function f() {
+        }
+        real function g() {
+        }
+        program {
+        real::arr(10);
+        character(len=5)::name;
+        integer::x = f(1) + arr(g(2));
+        }
+        """
+        expected = """integer function f() {
+        }
+        real function g() {
+        }
+        program {
+        integer::f;
+        real::g;
+        real::arr(10);
+        character(len=5)::name;
+        integer::x = f(1) + arr(g(2));
+        }"""
+
+        actual = declare_invoked_function_return_types(input)
+
+        self.assertEqualIgnoreWhitespace(expected, actual)
+
+    def test_undeclaredFunctionsAreReportedOnceAndIntrinsicsNever(self):
+        input = """program {
+        real::x = sqrt(abs(2.0)) + missing(1);
+        real::y = missing(2) + max(x, 1.0);
+        }"""
+        warnings = io.StringIO()
+
+        with redirect_stderr(warnings):
+            declare_invoked_function_return_types(input)
+
+        self.assertEqual("Warning: Function missing is never declared.\n", warnings.getvalue())
+
+    def test_functionSignaturesOfAHeaderSpanningSeveralLines(self):
+        input = """integer function add(integer::a,
+                integer::b) {
+        }"""
+
+        self.assertEqual({"add": "integer"}, function_signatures(input))
+
+    def test_functionSignaturesOfFunctionsSharingALine(self):
+        input = """integer function f(integer::a) { f = a; } real function g(real::b) { g = b; }
+        }"""
+
+        self.assertEqual({"f": "integer", "g": "real"}, function_signatures(input))
+
     def test_addImplicitNoneToEveryCodeBlock(self):
         input = """integer function myFunction() {
         }"""
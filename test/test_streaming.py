@@ -0,0 +1,100 @@
+import io
+import os
+import tempfile
+import unittest
+
+from fortiori.exceptions import UnbalancedBracketException, CannotFindSymbolDeclarationException
+from fortiori.incremental import iter_units
+from fortiori.streaming import transpile_stream, stream_file
+from fortiori.transpiler import Transpiler
+
+SOURCE = """integer function addOne(integer::x) {
+    return x + 1;
+}
+subroutine doThings() { print*, "}"; }
+program {
+    integer::Total = addOne(3);
+}
+"""
+
+
+class StreamingTest(unittest.TestCase):
+
+    def test_unitsAreYieldedBeforeTheRestIsRead(self):
+        read = []
+        lines = (read.append(line) or line for line in io.StringIO(SOURCE))
+
+        first_unit = next(iter_units(lines))
+
+        self.assertEqual(3, len(read))
+        self.assertTrue(first_unit.endswith("return x + 1;\n}\n"))
+
+    def test_bracketsInsideStringsAndCommentsAreIgnored(self):
+        units = list(iter_units(io.StringIO(SOURCE + "! }\n")))
+
+        self.assertEqual(4, len(units))
+        self.assertTrue(units[1].startswith("subroutine"))
+
+    def test_unbalancedClosingBracketRaises(self):
+        with self.assertRaises(UnbalancedBracketException):
+            list(iter_units(io.StringIO("program {\n}\n}\n")))
+
+    def test_unclosedBlockRaises(self):
+        with self.assertRaises(UnbalancedBracketException):
+            list(iter_units(io.StringIO("program {\n")))
+
+    def test_outputIsIdenticalToWholeFileTranspilation(self):
+        sink = io.StringIO()
+
+        transpile_stream(io.StringIO(SOURCE), sink, Transpiler())
+
+        self.assertEqual(Transpiler().transpile(SOURCE), sink.getvalue())
+
+    def test_trailingCommentAddsNoLine(self):
+        sink = io.StringIO()
+
+        transpile_stream(io.StringIO(SOURCE + "\n! done\n"), sink, Transpiler())
+
+        self.assertEqual(Transpiler().transpile(SOURCE), sink.getvalue())
+
+    def test_crossUnitOperationsReceiveSignaturesOfWholeStream(self):
+        sink = io.StringIO()
+
+        transpile_stream(io.StringIO(SOURCE), sink, Transpiler())
+
+        self.assertIn("integer::addo$ne;", sink.getvalue())
+
+    def test_sourcesWhichCannotSeekAreSpooled(self):
+        pipe = io.StringIO(SOURCE)
+        pipe.seekable = lambda: False
+        sink = io.StringIO()
+
+        transpile_stream(pipe, sink, Transpiler())
+
+        self.assertEqual(Transpiler().transpile(SOURCE), sink.getvalue())
+
+    def test_functionsWithHeadersSpanningLinesAreDeclared(self):
+        source = "integer function add(integer::a,\n        integer::b) {\n    add = a + b;\n}\n" \
+                 "program {\n    integer::x = add(1, 2);\n}\n"
+        sink = io.StringIO()
+
+        transpile_stream(io.StringIO(source), sink, Transpiler())
+
+        self.assertIn("integer::add;", sink.getvalue())
+        self.assertEqual(Transpiler().transpile(source), sink.getvalue())
+
+    def test_failingUnitLeavesThePreviousOutputInPlace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source_path = os.path.join(directory, "main.ff")
+            output = os.path.join(directory, "main.f90")
+            with open(output, 'w') as f:
+                f.write("previous")
+            with open(source_path, 'w') as f:
+                f.write(SOURCE + "subroutine broken() {\n  p = cast(q)\n}\n")
+
+            with self.assertRaises(CannotFindSymbolDeclarationException):
+                stream_file(source_path, directory, Transpiler())
+
+            self.assertEqual(["main.f90", "main.ff"], sorted(os.listdir(directory)))
+            with open(output) as f:
+                self.assertEqual("previous", f.read())
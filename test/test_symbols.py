@@ -0,0 +1,43 @@
+import unittest
+
+from fortiori.exceptions import CannotFindSymbolDeclarationException
+from fortiori.symbols import SymbolTable
+from fortiori.syntax import parse
+
+TEXT = """myType, object::globalInstance;
+integer function myFunction() {
+    integer::a, b = 2;
+    do i = 1, 10 {
+        real::a;
+        usage;
+    }
+    usage;
+}
+"""
+
+
+class SymbolTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = SymbolTable(parse(TEXT), {"myFunction": "integer"})
+
+    def test_innermostDeclarationWins(self):
+        self.assertEqual("real::a", self.table.declaration("a", TEXT.index("usage")).line)
+        self.assertEqual("integer::a, b = 2", self.table.declaration("a", TEXT.rindex("usage")).line)
+
+    def test_everyNameOfADeclarationIsDeclared(self):
+        self.assertEqual("b", self.table.declaration("b", TEXT.index("usage")).symbol_name)
+
+    def test_topLevelDeclarationsAreVisibleEverywhere(self):
+        declaration = self.table.declaration("globalInstance", TEXT.index("usage"))
+
+        self.assertTrue(declaration.is_gc_object())
+        self.assertEqual("myType", declaration.get_object_declared_type())
+
+    def test_undeclaredSymbolRaises(self):
+        with self.assertRaises(CannotFindSymbolDeclarationException):
+            self.table.declaration("missing", TEXT.index("usage"))
+
+    def test_returnTypeOfDeclaredFunction(self):
+        self.assertEqual("integer", self.table.return_type("myFunction"))
+        self.assertIsNone(self.table.return_type("missing"))
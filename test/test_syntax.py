@@ -0,0 +1,71 @@
+import unittest
+
+from fortiori.edits import CodeEdit, apply_edits
+from fortiori.exceptions import UnbalancedBracketException
+from fortiori.syntax import parse, reparse, tokenize, Block, STRING, COMMENT_TOKEN, WORD
+
+
+class SyntaxTest(unittest.TestCase):
+    SOURCE = """integer function myFunction(a, b)
+    {
+        print*, "{not a block}"; ! a comment }
+        do i=1,10 {
+            stuff;
+        }
+    }
+    program main {
+    }"""
+
+    def test_emitReproducesSource(self):
+        self.assertEqual(self.SOURCE, parse(self.SOURCE).emit())
+
+    def test_stringsAndCommentsAreSingleTokens(self):
+        kinds = {token.text: token.kind for token in tokenize(self.SOURCE)}
+
+        self.assertEqual(STRING, kinds['"{not a block}"'])
+        self.assertEqual(COMMENT_TOKEN, kinds["! a comment }"])
+        self.assertEqual(WORD, kinds["myFunction"])
+
+    def test_blocksAreNestedInProgramUnits(self):
+        tree = parse(self.SOURCE)
+
+        units = [unit for unit in tree.units if isinstance(unit, Block)]
+        self.assertEqual(["function", "program"], [unit.block_type for unit in units])
+        self.assertEqual(["function", "do", "program"], [block.block_type for block in tree.blocks()])
+        self.assertEqual(self.SOURCE.index("{") + 1, units[0].block_start)
+
+    def test_headerOnPreviousLineBelongsToBlock(self):
+        function_block = next(parse(self.SOURCE).blocks())
+
+        self.assertEqual("myFunction", function_block.name())
+
+    def test_blocksReferenceTheSourceByOffsets(self):
+        do_block = list(parse(self.SOURCE).blocks())[1]
+
+        self.assertIs(self.SOURCE, do_block.source)
+        self.assertEqual("\n            stuff;\n        ", do_block.block_content)
+        self.assertFalse(hasattr(do_block, "__dict__"))
+
+    def test_blockTypeIsAWholeWord(self):
+        blocks = list(parse("subroutine doThings() {\n}").blocks())
+
+        self.assertEqual("subroutine", blocks[0].block_type)
+
+    def test_reparseMatchesTheParseOfTheEditedText(self):
+        edits = [CodeEdit(self.SOURCE.index("stuff"), self.SOURCE.index("stuff") + 5, "if (a) {\n}"),
+                 CodeEdit(self.SOURCE.index("main"), self.SOURCE.index("main"), "other ")]
+        edited = apply_edits(self.SOURCE, edits)
+
+        actual = reparse(parse(self.SOURCE), self.SOURCE, edits, edited)
+
+        expected = parse(edited)
+        self.assertEqual([(token.kind, token.text, token.position) for token in expected.tokens],
+                         [(token.kind, token.text, token.position) for token in actual.tokens])
+        self.assertEqual([(block.block_type, block.block_start, block.block_end) for block in expected.blocks()],
+                         [(block.block_type, block.block_start, block.block_end) for block in actual.blocks()])
+
+    def test_unbalancedBracketsAreRejected(self):
+        with self.assertRaises(UnbalancedBracketException):
+            parse("program {\n}\n}")
+        with self.assertRaises(UnbalancedBracketException):
+            parse("program {\n")
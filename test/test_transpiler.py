@@ -0,0 +1,93 @@
+import io
+import unittest
+
+from fortiori.edits import remove_unused_whitespace, apply_edits, CodeEdit
+from fortiori.exceptions import CannotFindSymbolDeclarationException
+from fortiori.operation import Operation, TreeOperation
+from fortiori.transpiler import Transpiler
+
+
+class TranspilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def test_operationIsSkippedWhenItsTriggersAreAbsent(self):
+        transpiler = Transpiler(operations=[Operation("cast", self._record("cast"), ("cast(",)),
+                                            Operation("always", self._record("always"))])
+
+        transpiler.transpile("integer::a = 5;")
+
+        self.assertEqual(["always"], self.calls)
+
+    def test_operationRunsWhenAnyTriggerIsPresent(self):
+        transpiler = Transpiler(operations=[Operation("conditional", self._record("conditional"), ("if", "else"))])
+
+        transpiler.transpile("} else {")
+
+        self.assertEqual(["conditional"], self.calls)
+
+    def test_consecutiveTreeOperationsShareOneParse(self):
+        trees = []
+        record_tree = lambda tree: trees.append(tree) or tree
+        transpiler = Transpiler(operations=[TreeOperation("first", record_tree),
+                                            TreeOperation("second", record_tree),
+                                            Operation("text", lambda text: text.upper())])
+
+        actual = transpiler.transpile("program {\n}")
+
+        self.assertIs(trees[0], trees[1])
+        self.assertEqual("PROGRAM {\n}", actual)
+
+    def test_parsedOperationsFollowOneParseThroughTheEdits(self):
+        trees = []
+        record_tree = lambda text, tree=None: trees.append(tree) or text
+        rename = lambda text, tree=None: apply_edits(text, [CodeEdit(8, 12, "renamed")])
+        transpiler = Transpiler(operations=[Operation("rename", rename, parsed=True),
+                                            Operation("second", record_tree, parsed=True),
+                                            TreeOperation("tree", lambda tree: record_tree(tree, tree))])
+
+        transpiler.transpile("program main {\n}")
+
+        self.assertEqual("program renamed {\n}", trees[0].emit())
+        self.assertEqual("renamed", trees[0].tokens[2].text)
+        self.assertIs(trees[0], trees[1])
+
+    def test_defaultPipeline(self):
+        actual = Transpiler().transpile("""integer function addOne(integer::x) {
+        return x + 1; ! comment
+        }""")
+
+        self.assertEqual(["integer function addo$ne(x)", "implicit none;", "integer::x;", "addo$ne = x + 1;",
+                          "return;", "end function;"],
+                         [line.strip() for line in actual.split("\n") if line.strip()])
+
+    def test_finalWhitespaceRemovalIsAppliedWhileWriting(self):
+        transpiler = Transpiler(operations=[TreeOperation("tree", lambda tree: tree),
+                                            Operation("remove_unused_whitespace", remove_unused_whitespace)])
+        sink = io.StringIO()
+
+        transpiler.transpile_to("program   {\n\n}  ", sink)
+
+        self.assertEqual("program {\n}", sink.getvalue())
+
+    def test_errorsAreLocatedInTheSourceDespiteEarlierEdits(self):
+        source = "program {\n  ! comment\n  integer::a\n  a = 1 &\n    + 2\n  p = cast(q)\n}"
+
+        with self.assertRaises(CannotFindSymbolDeclarationException) as context:
+            Transpiler().transpile(source)
+
+        self.assertEqual((6, 3), (context.exception.line, context.exception.column))
+
+    def test_errorsAfterHoistedDeclarationsKeepTheirLine(self):
+        with self.assertRaises(CannotFindSymbolDeclarationException) as context:
+            Transpiler().transpile("program {\n  integer::x;\n  y = cast(z);\n}")
+
+        self.assertEqual((3, 3), (context.exception.line, context.exception.column))
+
+    def _record(self, name):
+        def operation(text: str) -> str:
+            self.calls.append(name)
+            return text
+
+        return operation
@@ -0,0 +1,28 @@
+import unittest
+
+from fortiori.tree_operations import IdentifierEncodingCache
+
+
+class IdentifierEncodingCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = IdentifierEncodingCache(max_size=2)
+
+    def test_shortestEncodingIsChosen(self):
+        self.assertEqual("av$ariable", self.cache.encode("aVariable"))
+        self.assertEqual("av$$ariable$$", self.cache.encode("aVARIABLE"))
+
+    def test_repeatedIdentifiersAreEncodedOnce(self):
+        self.cache.encode("aVariable")
+        self.cache.encode("aVariable")
+
+        self.assertEqual(1, self.cache.new_encodings)
+
+    def test_leastRecentlyUsedIdentifierIsEvicted(self):
+        self.cache.encode("aVariable")
+        self.cache.encode("bVariable")
+        self.cache.encode("aVariable")
+
+        self.cache.encode("cVariable")
+
+        self.assertEqual(["aVariable", "cVariable"], sorted(self.cache.encodings()))
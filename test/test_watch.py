@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from fortiori import watch
+from fortiori.watch import Watcher, rebuild_targets
+
+
+class WatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = self._write("kernel.ff", "program {\n}")
+        self.watcher = Watcher([self.directory.name])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_firstPollReturnsEverySource(self):
+        self._write("notes.txt", "not a source")
+
+        self.assertEqual([self.source], self.watcher.poll())
+
+    def test_unchangedSourcesAreNotReturnedAgain(self):
+        self.watcher.poll()
+        os.utime(self.source, ns=(0, 0))
+
+        self.assertEqual([], self.watcher.poll())
+
+    def test_changedAndNewSourcesAreReturned(self):
+        self.watcher.poll()
+        self._write("kernel.ff", "program {\n  stuff;\n}")
+        added = self._write("other.ff", "program {\n}")
+
+        self.assertEqual(sorted([self.source, added]), sorted(self.watcher.poll()))
+
+    def test_sourceRemovedWhileBeingReadCountsAsRemoved(self):
+        def remove_before_reading(path: str) -> str:
+            os.remove(path)
+            return digest(path)
+        digest = watch._digest
+        watch._digest = remove_before_reading
+        self.addCleanup(setattr, watch, "_digest", digest)
+
+        self.assertEqual([], self.watcher.poll())
+        watch._digest = digest
+        self._write("kernel.ff", "program {\n}")
+        self.assertEqual([self.source], self.watcher.poll())
+
+    def test_filesUsingAChangedModuleAreRebuilt(self):
+        module = self._write("geometry.ff", "module geometry {\n}\n")
+        user = self._write("main.ff", "program {\n    use geometry;\n}\n")
+        interfaces = {}
+        rebuild_targets(interfaces, [self.source, module, user])
+
+        _, targets = rebuild_targets(interfaces, [module])
+
+        self.assertEqual(sorted([module, user]), sorted(targets))
+
+    def _write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
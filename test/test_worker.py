@@ -0,0 +1,68 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from fortiori.worker import serve
+
+
+class WorkerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_inlineSourceIsAnsweredWithItsText(self):
+        [response] = self._serve({"id": 7, "source": "program {\n}"})
+
+        self.assertEqual(7, response["id"])
+        self.assertTrue(response["ok"])
+        self.assertIn("end program;", response["text"])
+
+    def test_inputFileIsWrittenToOutputPath(self):
+        source = os.path.join(self.directory.name, "kernel.ff")
+        output = os.path.join(self.directory.name, "out", "kernel.f90")
+        with open(source, 'w') as f:
+            f.write("subroutine doThings() {\n}")
+
+        [response] = self._serve({"input": source, "output": output})
+
+        self.assertEqual(output, response["output"])
+        with open(output) as f:
+            self.assertIn("end subroutine;", f.read())
+
+    def test_eachRequestIsAnsweredInOrder(self):
+        responses = self._serve({"id": 1, "source": "program {\n}\n}"}, {"id": 2, "source": "program {\n}"})
+
+        self.assertEqual([(1, False), (2, True)], [(response["id"], response["ok"]) for response in responses])
+        self.assertIn("UnbalancedBracketException", responses[0]["error"])
+
+    def test_warningsAreReturnedAsDiagnostics(self):
+        [response] = self._serve({"source": "program {\n    print*, undefined(2.0);\n}"})
+
+        self.assertEqual(["Warning: Function undefined is never declared."], response["diagnostics"])
+
+    def test_invalidRequestIsReported(self):
+        responses = io.StringIO()
+
+        serve(io.StringIO("not json\n\n{\"id\": 3}\n"), responses)
+
+        answers = [json.loads(line) for line in responses.getvalue().splitlines()]
+        self.assertEqual([None, 3], [answer["id"] for answer in answers])
+        self.assertFalse(any(answer["ok"] for answer in answers))
+
+    def test_fieldsOfTheWrongTypeAreReported(self):
+        responses = self._serve({"id": 1, "input": None}, {"id": 2, "source": "program {\n}", "output": 5},
+                                {"id": 3, "source": "program {\n}"})
+
+        self.assertEqual([False, False, True], [response["ok"] for response in responses])
+        self.assertIn("'input' must be a str", responses[0]["error"])
+        self.assertIn("'output' must be a str", responses[1]["error"])
+
+    def _serve(self, *requests: dict) -> list:
+        responses = io.StringIO()
+        serve(io.StringIO("".join(json.dumps(request) + "\n" for request in requests)), responses)
+        return [json.loads(line) for line in responses.getvalue().splitlines()]